@@ -1,24 +1,64 @@
+from uuid import uuid4
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import get_settings
 
 settings = get_settings()
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DATABASE_ECHO,
-    future=True,
-)
-
-# Create session factory
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _create_engine(url: str):
+    """Async engine with the configured pool; asyncpg gets its statement cache size
+
+    The size applies to both asyncpg's own cache and SQLAlchemy's prepared
+    statement cache on top of it. At 0 every statement also gets a unique
+    name, so connections shared through pgbouncer never collide on names.
+    """
+    url = url.replace("postgresql://", "postgresql+asyncpg://")
+    options = {}
+    if url.startswith("postgresql+asyncpg://"):
+        cache_size = settings.DATABASE_STATEMENT_CACHE_SIZE
+        connect_args = {
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        }
+        if cache_size == 0:
+            connect_args["prepared_statement_name_func"] = _unique_statement_name
+        options["connect_args"] = connect_args
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+    return create_async_engine(url, echo=settings.DATABASE_ECHO, future=True, **options)
+
+
+def _session_factory(bind):
+    return sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+# Create async engines (the read engine is the primary unless a replica is configured)
+engine = _create_engine(settings.DATABASE_URL)
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
+
+# Create session factories
+AsyncSessionLocal = _session_factory(engine)
+AsyncReadSessionLocal = _session_factory(read_engine)
 
 # Base for all models
 Base = declarative_base()
@@ -33,12 +73,62 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Dependency for a read-only session on the replica (may lag the primary slightly)"""
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def dialect_insert(session: AsyncSession, table):
+    """INSERT with the session dialect's ON CONFLICT support"""
+    return _INSERTS[session.bind.dialect.name](table)
+
+# (table, column) added to existing tables after their creation, oldest first
+ADDED_COLUMNS = [
+    ("signals", "snapshot_id"),
+]
+
+
+def _add_missing_columns(connection):
+    """create_all never alters existing tables; add the listed columns where they are missing"""
+    existing = {}
+    for table_name, column_name in ADDED_COLUMNS:
+        if table_name not in existing:
+            existing[table_name] = {c["name"] for c in inspect(connection).get_columns(table_name)}
+        if column_name in existing[table_name]:
+            continue
+
+        column = Base.metadata.tables[table_name].c[column_name]
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(connection.dialect)}"
+        for foreign_key in column.foreign_keys:
+            ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+        connection.execute(text(ddl))
+        existing[table_name].add(column_name)
+
+
+def _create_missing_indexes(connection):
+    """create_all skips indexes of tables that already exist; add any that are missing"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and bring existing ones up to date"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def close_db():
-    """Close database connection"""
+    """Close database connections"""
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
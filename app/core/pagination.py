@@ -0,0 +1,83 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import select, desc, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past the row with this (timestamp, id) key"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Validate a comma separated ``fields`` parameter against a response schema"""
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return names
+
+
+async def fetch_page(
+    db: AsyncSession,
+    model,
+    time_column,
+    filters: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of rows ordered newest first by ``(time_column, id)``
+
+    Returns ``(rows, next_cursor)``. Rows are ORM objects, or plain dicts with
+    only ``fields`` when a projection is requested. The page continues from the
+    cursor with an index range scan instead of an OFFSET.
+    """
+    if fields is None:
+        query = select(model)
+    else:
+        columns = dict.fromkeys([*fields, time_column.key, "id"])
+        query = select(*(getattr(model, name) for name in columns))
+
+    if cursor is not None:
+        query = query.where(tuple_(time_column, model.id) < tuple_(*decode_cursor(cursor)))
+
+    result = await db.execute(
+        query.where(*filters).order_by(desc(time_column), desc(model.id)).limit(limit + 1)
+    )
+    rows = result.scalars().all() if fields is None else result.mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if fields is None:
+            next_cursor = encode_cursor(getattr(last, time_column.key), last.id)
+        else:
+            next_cursor = encode_cursor(last[time_column.key], last["id"])
+
+    if fields is not None:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return rows, next_cursor
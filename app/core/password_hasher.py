@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict
+
+from passlib.context import CryptContext
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a dedicated thread pool
+
+    bcrypt releases the GIL, so the event loop keeps serving ticks and other
+    requests while a hash is computed. At most ``max_pending`` operations may be
+    queued or running; beyond that calls fail fast with ``PasswordHasherBusy``
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int = 0, max_pending: int = 64):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+
+    async def _submit(self, func: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        self.pending += 1
+        queued_at = time.monotonic()
+
+        def timed():
+            started_at = time.monotonic()
+            result = func(*args)
+            return result, started_at - queued_at, time.monotonic() - started_at
+
+        try:
+            result, wait, run = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_wait += wait
+        self.total_run += run
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self) -> Dict:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / completed * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "avg_run_ms": round(self.total_run / completed * 1000, 3),
+        }
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    settings = get_settings()
+    hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+    logger.info(f"Password hashing on {hasher.workers} threads, at most {hasher.max_pending} pending")
+    return hasher
@@ -0,0 +1,85 @@
+"""Check that the hot queries are served by their indexes
+
+Run against a database with ``python -m app.core.query_audit``; exits non-zero
+when a query does not use the index it is expected to.
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import select, desc, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.database import Trade, TradeStatus, Signal
+
+
+def hot_queries() -> Dict[str, tuple]:
+    """Query name -> (statement, index it must use)"""
+    since = datetime.utcnow() - timedelta(days=30)
+    return {
+        "active_trades": (
+            select(Trade)
+            .where(Trade.user_id == 1, Trade.status == TradeStatus.OPEN)
+            .order_by(desc(Trade.opened_at)),
+            "ix_trades_user_open_opened_at",
+        ),
+        "trade_history_page": (
+            select(Trade)
+            .where(Trade.user_id == 1, Trade.closed_at >= since)
+            .order_by(desc(Trade.closed_at), desc(Trade.id))
+            .limit(51),
+            "ix_trades_user_closed_at",
+        ),
+        "signal_feed_page": (
+            select(Signal)
+            .where(Signal.user_id == 1, Signal.created_at >= since)
+            .order_by(desc(Signal.created_at), desc(Signal.id))
+            .limit(51),
+            "ix_signals_user_created_at",
+        ),
+    }
+
+
+async def explain(db, statement) -> List[str]:
+    """Query plan lines for a statement, compiled with its literal values"""
+    dialect = db.bind.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    result = await db.execute(text(prefix + sql))
+    return [str(row[-1]) for row in result]
+
+
+async def audit_query_plans() -> Dict[str, Dict]:
+    """Plan of every hot query and whether it uses its expected index"""
+    report = {}
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            # Small tables are cheaper to scan; ask whether the index is usable at all
+            await db.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, (statement, index) in hot_queries().items():
+            plan = await explain(db, statement)
+            report[name] = {
+                "index": index,
+                "uses_index": any(index in line for line in plan),
+                "plan": plan,
+            }
+        await db.rollback()
+    return report
+
+
+async def main() -> int:
+    report = await audit_query_plans()
+    await engine.dispose()
+    failures = 0
+    for name, entry in report.items():
+        status = "ok" if entry["uses_index"] else f"MISSING {entry['index']}"
+        print(f"{name}: {status}")
+        for line in entry["plan"]:
+            print(f"    {line}")
+        failures += not entry["uses_index"]
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
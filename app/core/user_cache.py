@@ -0,0 +1,31 @@
+from functools import lru_cache
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.core.ttl_cache import TTLCache
+from app.models.database import User
+
+
+class UserCache(TTLCache[int, User]):
+    """Bounded TTL cache of authenticated users by id (least recently used evicted first)
+
+    Entries are detached ``User`` instances. Any flushed update or delete of a
+    user evicts it, so deactivation and password changes take effect on the
+    next request of this process; other processes see them after ``ttl``.
+    """
+
+    def put(self, user: User):
+        super().put(user.id, user)
+
+
+@lru_cache()
+def get_user_cache() -> UserCache:
+    settings = get_settings()
+    return UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target: User):
+    get_user_cache().invalidate(target.id)
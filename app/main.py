@@ -4,8 +4,21 @@ from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import get_settings
-from app.core.database import init_db, close_db
-from app.routes import auth, account, trades, signals
+from app.core.database import AsyncSessionLocal, init_db, close_db
+from app.core.password_hasher import get_password_hasher
+from app.routes import auth, account, trades, signals, stream, analytics
+from app.services.analytics import get_metrics_cache
+from app.services.live_feed import get_live_feed
+from app.services.mark_to_market import get_mark_to_market_engine
+from app.services.mt5_connector import get_mt5_connector
+from app.services.risk_engine import get_risk_engine
+from app.services.signal_hub import get_signal_hub
+from app.services.signal_scanner import get_signal_scanner
+from app.services.signal_scheduler import get_signal_scheduler
+from app.services.signal_writer import get_signal_writer
+from app.services.symbol_specs import get_symbol_specs
+from app.services.tick_aggregator import get_tick_aggregator
+from app.services.trade_stats import backfill_trade_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,11 +33,47 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up FastAPI application")
     await init_db()
+    async with AsyncSessionLocal() as db:
+        await backfill_trade_stats(db)
+        await get_symbol_specs().load(db)
+        await get_signal_hub().load(db)
+    scanner = get_signal_scanner()
+    logger.info(f"Signal scanner running in {scanner.mode} mode")
+    connector = get_mt5_connector()
+    await connector.connect()
+    feed = get_live_feed()
+    mark_to_market = get_mark_to_market_engine()
+    await mark_to_market.load()
+    risk = get_risk_engine()
+    async with AsyncSessionLocal() as db:
+        await risk.load(db, mark_to_market.open_trades())
+    mark_to_market.add_listener(feed.on_trade_updates)
+    mark_to_market.add_listener(risk.on_trade_updates)
+    mark_to_market.add_close_listener(feed.on_trades_closed)
+    mark_to_market.add_close_listener(get_metrics_cache().on_trades_closed)
+    mark_to_market.add_close_listener(risk.on_trades_closed)
+    mark_to_market.start(connector)
+    signal_writer = get_signal_writer()
+    signal_writer.start()
+    signal_hub = get_signal_hub()
+    tick_aggregator = get_tick_aggregator()
+    tick_aggregator.add_listener(signal_hub.on_bar_closed)
+    tick_aggregator.start(connector)
+    signal_scheduler = get_signal_scheduler()
+    signal_scheduler.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down FastAPI application")
+    await signal_scheduler.stop()
+    await tick_aggregator.stop()
+    feed.close_all()
+    await signal_writer.stop()
+    await mark_to_market.stop()
+    await connector.disconnect()
+    scanner.shutdown()
+    get_password_hasher().shutdown()
     await close_db()
 
 
@@ -50,6 +99,8 @@ app.include_router(auth.router)
 app.include_router(account.router)
 app.include_router(trades.router)
 app.include_router(signals.router)
+app.include_router(stream.router)
+app.include_router(analytics.router)
 
 
 @app.get("/", tags=["Root"])
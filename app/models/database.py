@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, Boolean, Enum, ForeignKey, Text
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Boolean, Enum, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -72,16 +72,85 @@ class Trade(Base):
     closed_at = Column(DateTime, nullable=True)
     close_reason = Column(String, nullable=True)
     
+    __table_args__ = (
+        # Active trades of a user, newest first (partial: open trades only)
+        Index(
+            "ix_trades_user_open_opened_at", user_id, opened_at,
+            postgresql_where=status == TradeStatus.OPEN,
+            sqlite_where=status == TradeStatus.OPEN,
+        ),
+        # Closed trade history pages on (closed_at, id)
+        Index("ix_trades_user_closed_at", user_id, closed_at, id),
+    )
+    
     # Relationship
     user = relationship("User", back_populates="trades")
 
 
+class TradeStatsDaily(Base):
+    """Running aggregates of a user's closed trades, one row per UTC day"""
+    __tablename__ = "trade_stats_daily"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    trades = Column(Integer, nullable=False, default=0)
+    winning_trades = Column(Integer, nullable=False, default=0)
+    losing_trades = Column(Integer, nullable=False, default=0)
+    total_pnl = Column(Float, nullable=False, default=0.0)
+    max_pnl = Column(Float, nullable=False)
+    min_pnl = Column(Float, nullable=False)
+
+
+class SymbolSpec(Base):
+    """Contract specification of a tradable symbol"""
+    __tablename__ = "symbol_specs"
+    
+    symbol = Column(String, primary_key=True)
+    contract_size = Column(Float, nullable=False)  # units per lot
+    pip_size = Column(Float, nullable=False)  # price change of one pip
+    pip_value = Column(Float, nullable=False)  # account currency per pip per lot
+    min_lot = Column(Float, nullable=False)
+    max_lot = Column(Float, nullable=False)
+    lot_step = Column(Float, nullable=False)
+    margin_rate = Column(Float, nullable=False)  # required margin / notional
+
+
 class SignalType(str, enum.Enum):
     BUY = "buy"
     SELL = "sell"
     HOLD = "hold"
 
 
+class SignalSubscription(Base):
+    """A user following the signals of one symbol/timeframe"""
+    __tablename__ = "signal_subscriptions"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    symbol = Column(String, primary_key=True)
+    timeframe = Column(Integer, primary_key=True)  # minutes
+    confidence_threshold = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SignalSnapshot(Base):
+    """Indicator payload of one generated signal, stored once per symbol/timeframe/bar"""
+    __tablename__ = "signal_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, nullable=False)
+    timeframe = Column(Integer, nullable=False)  # minutes
+    bar_time = Column(DateTime, nullable=False)
+    signal_type = Column(Enum(SignalType), nullable=False)
+    confidence = Column(Float, nullable=False)
+    current_price = Column(Float, nullable=True)
+    indicators_data = Column(Text, nullable=True)  # JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("symbol", "timeframe", "bar_time", name="uq_signal_snapshots_bar"),
+    )
+
+
 class Signal(Base):
     __tablename__ = "signals"
     
@@ -93,9 +162,15 @@ class Signal(Base):
     entry_price = Column(Float, nullable=True)
     stop_loss = Column(Float, nullable=True)
     take_profit = Column(Float, nullable=True)
-    indicators_data = Column(Text, nullable=True)  # JSON string
+    indicators_data = Column(Text, nullable=True)  # JSON string (see snapshot for bulk-written signals)
     is_valid = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    snapshot_id = Column(Integer, ForeignKey("signal_snapshots.id"), nullable=True)
+    
+    __table_args__ = (
+        # Signal feed / history pages on (created_at, id)
+        Index("ix_signals_user_created_at", user_id, created_at, id),
+    )
     
     # Relationship
     user = relationship("User", back_populates="signals")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
@@ -61,6 +61,20 @@ class TradeStatus(str, Enum):
     PENDING = "pending"
 
 
+def check_trade_levels(direction: TradeDirection, stop_loss: float, take_profit: float,
+                       entry_price: Optional[float] = None):
+    """Raise ValueError unless the stop loss and take profit lie on the right sides
+
+    Buys need stop_loss < take_profit (sells the reverse) and, when
+    ``entry_price`` is given, the entry strictly between them.
+    """
+    low, high = (stop_loss, take_profit) if direction.value == "buy" else (take_profit, stop_loss)
+    if not low < high:
+        raise ValueError(f"stop_loss and take_profit are in the wrong order for a {direction.value} trade")
+    if entry_price is not None and not low < entry_price < high:
+        raise ValueError("entry_price must lie between stop_loss and take_profit")
+
+
 class TradeCreate(BaseModel):
     symbol: str
     direction: TradeDirection
@@ -68,6 +82,11 @@ class TradeCreate(BaseModel):
     stop_loss: float
     take_profit: float
     volume: float
+    
+    @model_validator(mode="after")
+    def check_levels(self):
+        check_trade_levels(self.direction, self.stop_loss, self.take_profit, self.entry_price)
+        return self
 
 
 class TradeResponse(BaseModel):
@@ -99,7 +118,8 @@ class TradeHistoryResponse(BaseModel):
     average_profit: float
     max_profit: float
     max_loss: float
-    trades: List[TradeResponse]
+    trades: List[TradeResponse] = []
+    next_cursor: Optional[str] = None
 
 
 # ============ Signal Schemas ============
@@ -136,6 +156,23 @@ class SignalFeedResponse(BaseModel):
     latest_signal: Optional[SignalResponse]
     valid_signals_count: int
     signals: List[SignalResponse]
+    next_cursor: Optional[str] = None
+
+
+class SignalSubscriptionCreate(BaseModel):
+    symbol: str
+    timeframe: Optional[int] = None  # minutes, defaults to TARGET_TIMEFRAME
+    confidence_threshold: Optional[float] = Field(None, ge=0, le=100)  # defaults to SIGNAL_CONFIDENCE_THRESHOLD
+
+
+class SignalSubscriptionResponse(BaseModel):
+    symbol: str
+    timeframe: int
+    confidence_threshold: float
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
 
 
 # ============ Settings Schemas ============
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db, get_read_db
 from app.models.schemas import AccountResponse
 from app.models.database import User, Account
 from app.routes.auth import get_current_user
+from app.services.risk_engine import get_risk_engine
 
 router = APIRouter(prefix="/account", tags=["Account"])
 
@@ -12,26 +13,31 @@ router = APIRouter(prefix="/account", tags=["Account"])
 @router.get("/info", response_model=AccountResponse)
 async def get_account_info(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get account information"""
     # Get user's primary account (first account)
-    result = await db.execute(
-        select(Account).where(Account.user_id == current_user.id).limit(1)
-    )
+    query = select(Account).where(Account.user_id == current_user.id).limit(1)
+    result = await db.execute(query)
     account = result.scalars().first()
     
     if not account:
-        # Create default account if not exists
-        account = Account(
-            user_id=current_user.id,
-            balance=10000.0,  # Demo balance
-            equity=10000.0,
-            free_margin=10000.0,
-        )
-        db.add(account)
-        await db.commit()
-        await db.refresh(account)
+        # The replica may lag or the account may not exist yet: check and create on the primary
+        async with AsyncSessionLocal() as primary:
+            result = await primary.execute(query)
+            account = result.scalars().first()
+            if not account:
+                # Create default account if not exists
+                account = Account(
+                    user_id=current_user.id,
+                    balance=10000.0,  # Demo balance
+                    equity=10000.0,
+                    free_margin=10000.0,
+                )
+                primary.add(account)
+                await primary.commit()
+                await primary.refresh(account)
+                get_risk_engine().set_balance(current_user.id, account.balance)
     
     return account
 
@@ -60,5 +66,6 @@ async def update_account(
         account.margin_level = margin_level
         await db.commit()
         await db.refresh(account)
+        get_risk_engine().set_balance(current_user.id, balance)
     
     return {"message": "Account updated"}
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.models.schemas import AnalyticsMetrics
+from app.models.database import User
+from app.routes.auth import get_current_user
+from app.services.analytics import compute_metrics, get_metrics_cache
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("", response_model=AnalyticsMetrics)
+async def get_analytics(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get performance metrics over all closed trades"""
+    # Read from the primary: the cache is invalidated on close and must not refill from a lagging replica
+    cache = get_metrics_cache()
+    metrics = cache.get(current_user.id)
+    if metrics is None:
+        metrics = await compute_metrics(db, current_user.id)
+        cache.put(current_user.id, metrics)
+    
+    return metrics
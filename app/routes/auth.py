@@ -5,24 +5,38 @@ from app.core.database import get_db
 from app.models.schemas import UserCreate, UserLogin, TokenResponse, UserResponse
 from app.models.database import User
 from app.core.config import get_settings
-from passlib.context import CryptContext
+from app.core.password_hasher import PasswordHasherBusy, get_password_hasher
+from app.core.user_cache import get_user_cache
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def get_password_hash(password: str) -> str:
-    """Hash password"""
-    return pwd_context.hash(password)
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 
+async def get_password_hash(password: str) -> str:
+    """Hash password (off the event loop)"""
+    try:
+        return await get_password_hasher().hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password"""
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password (off the event loop)"""
+    try:
+        return await get_password_hasher().verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -43,16 +57,35 @@ async def get_current_user(token: str, db: AsyncSession = Depends(get_db)) -> Us
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         if email is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalars().first()
+    cache = get_user_cache()
+    user = cache.get(user_id) if user_id is not None else None
     if user is None:
+        if user_id is not None:
+            user = await db.get(User, user_id)
+        else:
+            # Tokens issued before the uid claim was added
+            result = await db.execute(select(User).where(User.email == email))
+            user = result.scalars().first()
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        db.expunge(user)
+        cache.put(user)
+    
+    if user.email != email:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    
     return user
 
 
@@ -72,7 +105,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Create new user
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash(user_data.password),
         exness_login=user_data.exness_login,
     )
     
@@ -90,7 +123,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalars().first()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -109,7 +142,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     # Create token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=access_token_expires
     )
     
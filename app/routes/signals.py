@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from app.core.database import get_db
-from app.models.schemas import SignalResponse, SignalFeedResponse
-from app.models.database import User, Signal
+from sqlalchemy import select, desc, func
+from app.core.config import get_settings
+from app.core.database import get_db, get_read_db
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, parse_fields
+from app.models.schemas import (
+    SignalResponse, SignalFeedResponse, SignalSubscriptionCreate, SignalSubscriptionResponse
+)
+from app.models.database import User, Signal, SignalSubscription
 from app.routes.auth import get_current_user
+from app.services.mt5_connector import TIMEFRAMES
+from app.services.signal_hub import get_signal_hub
+from app.services.symbol_specs import get_symbol_specs
 from datetime import datetime, timedelta
+from typing import Optional
 
 router = APIRouter(prefix="/signals", tags=["Signals"])
+settings = get_settings()
 
 
 @router.get("/latest", response_model=SignalResponse)
 async def get_latest_signal(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get latest signal"""
     result = await db.execute(
@@ -31,37 +42,135 @@ async def get_latest_signal(
 async def get_signal_feed(
     current_user: User = Depends(get_current_user),
     hours: int = 24,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get signal feed from last N hours"""
+    """Get signal feed from last N hours, one page at a time
+
+    ``fields`` (comma separated) limits the signal columns returned.
+    """
     date_from = datetime.utcnow() - timedelta(hours=hours)
+    window = [Signal.user_id == current_user.id, Signal.created_at >= date_from]
+    columns = parse_fields(fields, SignalResponse)
     
-    result = await db.execute(
-        select(Signal).where(
-            Signal.user_id == current_user.id,
-            Signal.created_at >= date_from
-        ).order_by(desc(Signal.created_at))
+    signals, next_cursor = await fetch_page(
+        db, Signal, Signal.created_at, window, cursor=cursor, limit=limit, fields=columns
     )
-    signals = result.scalars().all()
     
-    latest_signal = signals[0] if signals else None
-    valid_signals_count = sum(1 for s in signals if s.is_valid)
+    if cursor is None:
+        latest_signal = signals[0] if signals else None
+    else:
+        latest, _ = await fetch_page(db, Signal, Signal.created_at, window, limit=1, fields=columns)
+        latest_signal = latest[0] if latest else None
+    
+    valid_signals_count = await db.scalar(
+        select(func.count()).select_from(Signal).where(*window, Signal.is_valid.is_(True))
+    )
+    
+    if columns is not None:
+        # Projected rows skip response model validation
+        return JSONResponse(jsonable_encoder({
+            "latest_signal": latest_signal,
+            "valid_signals_count": valid_signals_count,
+            "signals": signals,
+            "next_cursor": next_cursor,
+        }))
     
     return SignalFeedResponse(
         latest_signal=latest_signal,
         valid_signals_count=valid_signals_count,
-        signals=signals
+        signals=signals,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/history", response_model=list[SignalResponse])
 async def get_signal_history(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get signal history, one page at a time
+
+    The cursor of the next page is returned in the ``X-Next-Cursor`` header.
+    """
+    columns = parse_fields(fields, SignalResponse)
+    signals, next_cursor = await fetch_page(
+        db, Signal, Signal.created_at, [Signal.user_id == current_user.id],
+        cursor=cursor, limit=limit, fields=columns,
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    
+    if columns is not None:
+        # Projected rows skip response model validation
+        return JSONResponse(jsonable_encoder(signals), headers=headers)
+    
+    response.headers.update(headers)
+    return signals
+
+
+@router.get("/subscriptions", response_model=list[SignalSubscriptionResponse])
+async def get_subscriptions(
     current_user: User = Depends(get_current_user),
-    limit: int = 50,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get signal history"""
+    """Get the symbols/timeframes the user receives signals for"""
     result = await db.execute(
-        select(Signal).where(Signal.user_id == current_user.id).order_by(desc(Signal.created_at)).limit(limit)
+        select(SignalSubscription).where(SignalSubscription.user_id == current_user.id)
     )
     return result.scalars().all()
+
+
+@router.post("/subscriptions", response_model=SignalSubscriptionResponse)
+async def subscribe(
+    subscription: SignalSubscriptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Subscribe to (or change the confidence threshold of) a symbol/timeframe"""
+    if subscription.symbol not in get_symbol_specs():
+        raise HTTPException(status_code=400, detail=f"Unknown symbol: {subscription.symbol}")
+    
+    timeframe = subscription.timeframe if subscription.timeframe is not None else settings.TARGET_TIMEFRAME
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe: {timeframe}")
+    
+    threshold = subscription.confidence_threshold
+    if threshold is None:
+        threshold = settings.SIGNAL_CONFIDENCE_THRESHOLD
+    
+    row = await db.get(SignalSubscription, (current_user.id, subscription.symbol, timeframe))
+    if row is None:
+        row = SignalSubscription(user_id=current_user.id, symbol=subscription.symbol, timeframe=timeframe)
+        db.add(row)
+    row.confidence_threshold = threshold
+    await db.commit()
+    await db.refresh(row)
+    get_signal_hub().subscribe(current_user.id, row.symbol, row.timeframe, row.confidence_threshold)
+    
+    return row
+
+
+@router.delete("/subscriptions/{symbol}")
+async def unsubscribe(
+    symbol: str,
+    timeframe: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stop receiving signals for a symbol/timeframe"""
+    timeframe = timeframe if timeframe is not None else settings.TARGET_TIMEFRAME
+    row = await db.get(SignalSubscription, (current_user.id, symbol, timeframe))
+    if row is None:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    
+    await db.delete(row)
+    await db.commit()
+    get_signal_hub().unsubscribe(current_user.id, symbol, timeframe)
+    
+    return {"message": "Unsubscribed"}
@@ -0,0 +1,117 @@
+from fastapi import APIRouter, HTTPException, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_, desc
+from app.core.database import AsyncSessionLocal
+from app.models.schemas import TradeResponse, SignalResponse
+from app.models.database import Trade, TradeStatus, Signal
+from app.routes.auth import get_current_user
+from app.services.live_feed import FeedSubscription, get_live_feed
+from typing import Optional
+import asyncio
+import json
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+
+# Seconds without events before a heartbeat is sent
+KEEPALIVE_INTERVAL = 15
+
+
+async def open_feed(token: str) -> Optional[FeedSubscription]:
+    """Authenticate and subscribe a client, queueing a snapshot of its open trades and latest signal"""
+    # Use a short-lived session: the stream itself must not hold a DB connection
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user(token, db)
+        except HTTPException:
+            return None
+        
+        result = await db.execute(
+            select(Trade).where(
+                and_(
+                    Trade.user_id == user.id,
+                    Trade.status == TradeStatus.OPEN
+                )
+            ).order_by(desc(Trade.opened_at))
+        )
+        trades = result.scalars().all()
+        
+        result = await db.execute(
+            select(Signal).where(Signal.user_id == user.id).order_by(desc(Signal.created_at)).limit(1)
+        )
+        latest_signal = result.scalars().first()
+    
+    subscription = get_live_feed().subscribe(user.id)
+    subscription.offer({
+        "type": "snapshot",
+        "data": {
+            "trades": [TradeResponse.model_validate(t).model_dump(mode="json") for t in trades],
+            "latest_signal": SignalResponse.model_validate(latest_signal).model_dump(mode="json")
+            if latest_signal else None,
+        }
+    })
+    return subscription
+
+
+async def next_event(subscription: FeedSubscription) -> Optional[dict]:
+    """Next feed event, a heartbeat after KEEPALIVE_INTERVAL idle seconds, or None when the feed stops"""
+    try:
+        return await asyncio.wait_for(subscription.get(), KEEPALIVE_INTERVAL)
+    except asyncio.TimeoutError:
+        return {"type": "heartbeat", "data": None}
+
+
+@router.websocket("/ws")
+async def stream_websocket(websocket: WebSocket, token: str):
+    """Push signals and open-trade P&L over a WebSocket"""
+    subscription = await open_feed(token)
+    if subscription is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    
+    async def pump():
+        while True:
+            event = await next_event(subscription)
+            if event is None:
+                await websocket.close()
+                return
+            await websocket.send_json(event)
+    
+    sender = asyncio.create_task(pump())
+    try:
+        # Clients only listen; reading is how a disconnect is noticed
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sender.cancel()
+        subscription.close()
+
+
+@router.get("/events")
+async def stream_events(request: Request, token: str):
+    """Push signals and open-trade P&L as Server-Sent Events"""
+    subscription = await open_feed(token)
+    if subscription is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                event = await next_event(subscription)
+                if event is None:
+                    return
+                if event["type"] == "heartbeat":
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
-from app.core.database import get_db
-from app.models.schemas import TradeResponse, TradeHistoryResponse, TradeCreate
+from sqlalchemy import select, update, and_, desc
+from app.core.database import get_db, get_read_db
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, parse_fields
+from app.models.schemas import TradeResponse, TradeHistoryResponse, TradeCreate, check_trade_levels
 from app.models.database import User, Trade, TradeStatus
 from app.routes.auth import get_current_user
+from app.services.analytics import get_metrics_cache
+from app.services.live_feed import get_live_feed
+from app.services.mark_to_market import get_mark_to_market_engine
+from app.services.risk_engine import RiskLimitExceeded, get_risk_engine
+from app.services.symbol_specs import get_symbol_specs
+from app.services.trade_stats import get_trade_stats, record_closed_trades
 from datetime import datetime, timedelta
+from typing import Optional
 
 router = APIRouter(prefix="/trades", tags=["Trades"])
 
@@ -31,52 +41,35 @@ async def get_active_trades(
 async def get_trade_history(
     current_user: User = Depends(get_current_user),
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db)
+    include_trades: bool = Query(False),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get trade history"""
+    """Get trade history statistics and, with ``include_trades``, one page of closed trades
+
+    ``fields`` (comma separated) limits the trade columns returned.
+    """
     date_from = datetime.utcnow() - timedelta(days=days)
     
-    result = await db.execute(
-        select(Trade).where(
-            and_(
-                Trade.user_id == current_user.id,
-                Trade.closed_at >= date_from
-            )
-        ).order_by(desc(Trade.closed_at))
-    )
-    trades = result.scalars().all()
-    
-    if not trades:
-        return TradeHistoryResponse(
-            total_trades=0,
-            winning_trades=0,
-            losing_trades=0,
-            win_rate=0.0,
-            average_profit=0.0,
-            max_profit=0.0,
-            max_loss=0.0,
-            trades=[]
+    # Statistics come from the per-day buckets, whole days from date_from on
+    stats = await get_trade_stats(db, current_user.id, date_from.date())
+    
+    columns = parse_fields(fields, TradeResponse)
+    trades, next_cursor = [], None
+    if include_trades:
+        trades, next_cursor = await fetch_page(
+            db, Trade, Trade.closed_at,
+            [Trade.user_id == current_user.id, Trade.closed_at >= date_from],
+            cursor=cursor, limit=limit, fields=columns,
         )
     
-    # Calculate statistics
-    total_trades = len(trades)
-    winning_trades = sum(1 for t in trades if t.pnl > 0)
-    losing_trades = sum(1 for t in trades if t.pnl <= 0)
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0.0
-    average_profit = sum(t.pnl for t in trades) / total_trades if total_trades > 0 else 0.0
-    max_profit = max((t.pnl for t in trades), default=0.0)
-    max_loss = min((t.pnl for t in trades), default=0.0)
-    
-    return TradeHistoryResponse(
-        total_trades=total_trades,
-        winning_trades=winning_trades,
-        losing_trades=losing_trades,
-        win_rate=round(win_rate, 2),
-        average_profit=round(average_profit, 2),
-        max_profit=round(max_profit, 2),
-        max_loss=round(max_loss, 2),
-        trades=trades
-    )
+    if columns is not None:
+        # Projected rows skip response model validation
+        return JSONResponse(jsonable_encoder({**stats, "trades": trades, "next_cursor": next_cursor}))
+    
+    return TradeHistoryResponse(**stats, trades=trades, next_cursor=next_cursor)
 
 
 @router.post("/open", response_model=TradeResponse)
@@ -85,14 +78,29 @@ async def open_trade(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Open new trade"""
+    """Open new trade (volume may be scaled down to the risk limits)"""
+    specs = get_symbol_specs()
+    if trade.symbol not in specs:
+        raise HTTPException(status_code=400, detail=f"Unknown symbol: {trade.symbol}")
+    
+    risk = get_risk_engine()
+    await risk.ensure_user(db, current_user.id)
+    try:
+        volume = risk.check_order(
+            current_user.id, trade.entry_price, trade.stop_loss, trade.volume, specs.get(trade.symbol)
+        )
+    except RiskLimitExceeded as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    
     new_trade = Trade(
         user_id=current_user.id,
-        **trade.dict()
+        **{**trade.dict(), "volume": volume}
     )
     db.add(new_trade)
     await db.commit()
     await db.refresh(new_trade)
+    get_mark_to_market_engine().add_trade(new_trade)
+    risk.on_trade_opened(current_user.id, new_trade.id)
     
     return new_trade
 
@@ -119,23 +127,47 @@ async def close_trade(
     if not trade:
         raise HTTPException(status_code=404, detail="Trade not found")
     
-    # Calculate P&L
+    if trade.status == TradeStatus.CLOSED:
+        raise HTTPException(status_code=400, detail="Trade already closed")
+    
+    # Calculate P&L (on contract units, as the risk limits are)
+    units = get_symbol_specs().units(trade.symbol, trade.volume)
     if trade.direction.value == "buy":
-        pnl = (exit_price - trade.entry_price) * trade.volume
+        pnl = (exit_price - trade.entry_price) * units
     else:
-        pnl = (trade.entry_price - exit_price) * trade.volume
+        pnl = (trade.entry_price - exit_price) * units
     
-    pnl_percentage = (pnl / (trade.entry_price * trade.volume) * 100) if trade.entry_price > 0 else 0.0
+    notional = trade.entry_price * units
+    pnl_percentage = (pnl / notional * 100) if notional > 0 else 0.0
     
-    # Update trade
-    trade.status = TradeStatus.CLOSED
-    trade.exit_price = exit_price
-    trade.pnl = pnl
-    trade.pnl_percentage = pnl_percentage
-    trade.closed_at = datetime.utcnow()
-    trade.close_reason = close_reason
+    # Update trade, guarded on status so a concurrent auto-close (see
+    # MarkToMarketEngine.close_triggered) cannot close it a second time
+    closed_at = datetime.utcnow()
+    result = await db.execute(
+        update(Trade)
+        .where(Trade.id == trade.id, Trade.status == TradeStatus.OPEN)
+        .values(
+            status=TradeStatus.CLOSED,
+            exit_price=exit_price,
+            pnl=pnl,
+            pnl_percentage=pnl_percentage,
+            closed_at=closed_at,
+            close_reason=close_reason,
+        )
+        .returning(Trade.id)
+    )
+    if result.scalar() is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Trade already closed")
     
+    await record_closed_trades(db, [(trade.user_id, closed_at, pnl)])
     await db.commit()
+    await db.refresh(trade)
+    
+    get_mark_to_market_engine().remove_trade(trade)
+    get_metrics_cache().invalidate(current_user.id)
+    get_risk_engine().on_trade_closed(current_user.id, trade.id, pnl)
+    get_live_feed().publish(current_user.id, "trade_closed", TradeResponse.model_validate(trade).model_dump(mode="json"))
     
     return {"message": "Trade closed", "pnl": pnl}
 
@@ -166,10 +198,21 @@ async def update_trade(
     if current_price is not None:
         trade.current_price = current_price
         # Update P&L
+        units = get_symbol_specs().units(trade.symbol, trade.volume)
         if trade.direction.value == "buy":
-            trade.pnl = (current_price - trade.entry_price) * trade.volume
+            trade.pnl = (current_price - trade.entry_price) * units
         else:
-            trade.pnl = (trade.entry_price - current_price) * trade.volume
+            trade.pnl = (trade.entry_price - current_price) * units
+    
+    if stop_loss is not None or take_profit is not None:
+        try:
+            check_trade_levels(
+                trade.direction,
+                stop_loss if stop_loss is not None else trade.stop_loss,
+                take_profit if take_profit is not None else trade.take_profit,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     if stop_loss is not None:
         trade.stop_loss = stop_loss
@@ -179,4 +222,7 @@ async def update_trade(
     
     await db.commit()
     
+    if stop_loss is not None or take_profit is not None:
+        get_mark_to_market_engine().update_levels(trade)
+    
     return {"message": "Trade updated"}
@@ -0,0 +1,82 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.ttl_cache import TTLCache
+from app.models.database import Trade, TradeStatus
+
+
+def _duration_hours(db: AsyncSession, start, end):
+    if db.bind.dialect.name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24
+    return func.extract("epoch", end - start) / 3600
+
+
+async def compute_metrics(db: AsyncSession, user_id: int) -> Dict:
+    """Performance metrics over a user's closed trades, aggregated in the database
+
+    ``profit_factor`` is gross profit / gross loss, and 0 while there are no
+    losing trades. Streaks follow closing order.
+    """
+    closed = (Trade.user_id == user_id, Trade.status == TradeStatus.CLOSED)
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    is_win = Trade.pnl > 0
+
+    totals = (await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Trade.pnl), 0.0),
+            func.coalesce(func.sum(case((Trade.closed_at >= month_start, Trade.pnl), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((is_win, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_win, Trade.pnl), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((Trade.pnl < 0, -Trade.pnl), else_=0.0)), 0.0),
+            func.avg(_duration_hours(db, Trade.opened_at, Trade.closed_at)),
+        ).where(*closed)
+    )).one()
+    count, total_profit, monthly_profit, wins, gross_profit, gross_loss, avg_hours = totals
+
+    # Gaps and islands: consecutive trades with the same outcome share
+    # (position overall - position among trades with that outcome)
+    order = (Trade.closed_at, Trade.id)
+    ranked = select(
+        is_win.label("win"),
+        (func.row_number().over(order_by=order)
+         - func.row_number().over(partition_by=is_win, order_by=order)).label("island"),
+    ).where(*closed).subquery()
+    islands = select(
+        ranked.c.win, func.count().label("length")
+    ).group_by(ranked.c.win, ranked.c.island).subquery()
+    streaks = dict((await db.execute(
+        select(islands.c.win, func.max(islands.c.length)).group_by(islands.c.win)
+    )).all())
+
+    return {
+        "total_profit": round(total_profit, 2),
+        "monthly_profit": round(monthly_profit, 2),
+        "win_rate": round(wins / count * 100, 2) if count else 0.0,
+        "profit_factor": round(gross_profit / gross_loss, 2) if gross_loss else 0.0,
+        "max_consecutive_wins": streaks.get(True, 0),
+        "max_consecutive_losses": streaks.get(False, 0),
+        "average_trade_duration": round(avg_hours or 0.0, 2),
+    }
+
+
+class MetricsCache(TTLCache[int, Dict]):
+    """Per-user analytics results, dropped when one of the user's trades closes
+
+    Entries also expire after ``ttl`` seconds so month boundaries roll over.
+    """
+
+    def on_trades_closed(self, rows: List[Dict]):
+        """Mark-to-market close listener"""
+        for row in rows:
+            self.invalidate(row["user_id"])
+
+
+@lru_cache()
+def get_metrics_cache() -> MetricsCache:
+    return MetricsCache(ttl=get_settings().ANALYTICS_CACHE_TTL)
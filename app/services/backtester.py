@@ -0,0 +1,175 @@
+import numpy as np
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+from app.services import indicators as ta
+from app.services.candles import CandleBuffer, CandleView
+from app.services.signal_generator import SignalGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class Backtester:
+    """Replays a candle series through the SignalGenerator rules and simulates SL/TP exits
+
+    Indicators and signals are computed for the whole series in one vectorized
+    pass. Trades are then simulated one at a time: a position is opened at the
+    close of a valid BUY/SELL bar (only when flat) and closed on the first later
+    bar whose range touches the stop loss or take profit. When both levels fall
+    inside the same bar the stop loss is assumed to be hit first.
+    """
+
+    # Bars scanned per step when searching for an exit
+    EXIT_SEARCH_CHUNK = 256
+
+    def __init__(self, generator: SignalGenerator = None, initial_balance: float = 10000.0,
+                 risk_percent: float = 2.0, stop_loss_pips: float = 500.0,
+                 take_profit_pips: float = 1000.0, pip_size: float = 0.01,
+                 spec: Optional[Dict[str, float]] = None):
+        self.generator = generator or SignalGenerator()
+        self.initial_balance = initial_balance
+        self.risk_percent = risk_percent
+        self.stop_loss_pips = stop_loss_pips
+        self.take_profit_pips = take_profit_pips
+        self.pip_size = pip_size
+        # Contract spec used for position sizing (e.g. SymbolSpecs.get(symbol))
+        self.spec = spec
+
+    def compute_signals(self, candles: Union[CandleBuffer, CandleView],
+                        series: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Signal type, confidence and validity for every bar
+
+        ``series`` may hold indicators precomputed with the generator's periods.
+        """
+        closes = candles.close
+        if series is None:
+            series = ta.compute_indicators(closes, **self.generator.indicator_params())
+        signal_type, confidence = self.generator.evaluate_arrays(series, closes)
+
+        # generate_signal needs min_bars candles before it produces anything
+        warmup = min(self.generator.min_bars - 1, len(closes))
+        signal_type[:warmup] = "HOLD"
+        confidence[:warmup] = 0.0
+
+        return {
+            "signal_type": signal_type,
+            "confidence": confidence,
+            "is_valid": confidence >= self.generator.confidence_threshold,
+        }
+
+    def _find_exit(self, high: np.ndarray, low: np.ndarray, start: int,
+                   is_buy: bool, stop_loss: float, take_profit: float):
+        """First bar at or after ``start`` touching SL or TP, as (index, price, reason)"""
+        n = len(high)
+        while start < n:
+            stop = min(start + self.EXIT_SEARCH_CHUNK, n)
+            if is_buy:
+                sl_hit = low[start:stop] <= stop_loss
+                tp_hit = high[start:stop] >= take_profit
+            else:
+                sl_hit = high[start:stop] >= stop_loss
+                tp_hit = low[start:stop] <= take_profit
+
+            hits = sl_hit | tp_hit
+            if hits.any():
+                offset = int(hits.argmax())
+                if sl_hit[offset]:
+                    return start + offset, stop_loss, "stop_loss"
+                return start + offset, take_profit, "take_profit"
+            start = stop
+        return None
+
+    def run(self, candles: Union[CandleBuffer, CandleView], series: Dict[str, np.ndarray] = None) -> Dict:
+        """Backtest the rule set over a candle series (optionally with precomputed indicators)"""
+        n = len(candles)
+        times = candles.time
+        closes = candles.close
+        high = candles.high
+        low = candles.low
+
+        signals = self.compute_signals(candles, series)
+        entries = np.flatnonzero(signals["is_valid"] & (signals["signal_type"] != "HOLD"))
+
+        balance = self.initial_balance
+        equity = np.full(n, self.initial_balance)
+        trades: List[Dict] = []
+        sl_distance = self.stop_loss_pips * self.pip_size
+        tp_distance = self.take_profit_pips * self.pip_size
+
+        next_entry = 0
+        while next_entry < len(entries):
+            entry_index = int(entries[next_entry])
+            is_buy = signals["signal_type"][entry_index] == "BUY"
+            entry_price = float(closes[entry_index])
+            direction = 1.0 if is_buy else -1.0
+            stop_loss = entry_price - direction * sl_distance
+            take_profit = entry_price + direction * tp_distance
+            volume = self.generator.calculate_position_size(
+                balance, self.risk_percent, entry_price, self.stop_loss_pips, self.spec
+            )
+
+            hit = self._find_exit(high, low, entry_index + 1, is_buy, stop_loss, take_profit)
+            if hit is None:
+                exit_index, exit_price, reason = n - 1, float(closes[-1]), "end_of_data"
+            else:
+                exit_index, exit_price, reason = hit
+
+            pnl = direction * (exit_price - entry_price) * volume
+            # Mark the open position to market on every bar it is held
+            equity[entry_index:exit_index] = balance + direction * (closes[entry_index:exit_index] - entry_price) * volume
+            balance += pnl
+            equity[exit_index:] = balance
+
+            trades.append({
+                "direction": "buy" if is_buy else "sell",
+                "entry_index": entry_index,
+                "exit_index": exit_index,
+                "entry_time": _isoformat(times[entry_index]),
+                "exit_time": _isoformat(times[exit_index]),
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "stop_loss": stop_loss,
+                "take_profit": take_profit,
+                "volume": volume,
+                "pnl": pnl,
+                "close_reason": reason,
+            })
+
+            # Flat again after the exit bar; the next trade comes from a later signal
+            next_entry = int(np.searchsorted(entries, exit_index, side="right"))
+
+        return {
+            "trades": trades,
+            "equity": equity,
+            "time": times,
+            "summary": self._summarize(trades, equity),
+        }
+
+    def _summarize(self, trades: List[Dict], equity: np.ndarray) -> Dict:
+        pnl = np.array([t["pnl"] for t in trades], dtype=np.float64)
+        gross_profit = float(pnl[pnl > 0].sum())
+        gross_loss = float(-pnl[pnl <= 0].sum())
+
+        if len(equity):
+            peaks = np.maximum.accumulate(equity)
+            max_drawdown = float(((peaks - equity) / peaks).max() * 100)
+        else:
+            max_drawdown = 0.0
+
+        total_trades = len(trades)
+        winning_trades = int((pnl > 0).sum())
+        return {
+            "total_trades": total_trades,
+            "winning_trades": winning_trades,
+            "losing_trades": total_trades - winning_trades,
+            "win_rate": round(winning_trades / total_trades * 100, 2) if total_trades else 0.0,
+            "net_profit": round(float(pnl.sum()), 2),
+            "profit_factor": round(gross_profit / gross_loss, 2) if gross_loss > 0 else 0.0,
+            "max_drawdown": round(max_drawdown, 2),
+            "final_balance": round(float(equity[-1]) if len(equity) else self.initial_balance, 2),
+        }
+
+
+def _isoformat(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None).isoformat()
@@ -0,0 +1,118 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.candles import CandleBuffer, CandleView
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width little-endian record per bar (48 bytes)
+CANDLE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+class CandleStore:
+    """On-disk candle history, one append-only record file per symbol/timeframe
+
+    Files are read through ``np.memmap`` so range queries return views into the
+    mapped file instead of loading or copying the history.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def path(self, symbol: str, timeframe: int) -> Path:
+        return self.root / f"{symbol}_M{timeframe}.bin"
+
+    def _records(self, symbol: str, timeframe: int) -> np.ndarray:
+        """Memory-mapped records (re-mapped lazily after appends)"""
+        key = (symbol, timeframe)
+        records = self._maps.get(key)
+        if records is not None:
+            return records
+
+        path = self.path(symbol, timeframe)
+        size = path.stat().st_size if path.exists() else 0
+        count = size // CANDLE_DTYPE.itemsize
+        if count == 0:
+            records = np.empty(0, dtype=CANDLE_DTYPE)
+        else:
+            if size % CANDLE_DTYPE.itemsize:
+                logger.warning(f"Ignoring truncated trailing record in {path}")
+            records = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+        self._maps[key] = records
+        return records
+
+    def count(self, symbol: str, timeframe: int) -> int:
+        return len(self._records(symbol, timeframe))
+
+    def last_time(self, symbol: str, timeframe: int) -> Optional[int]:
+        records = self._records(symbol, timeframe)
+        return int(records["time"][-1]) if len(records) else None
+
+    def append(self, symbol: str, timeframe: int, candles: Union[CandleBuffer, CandleView]) -> int:
+        """Append bars newer than the last stored one; returns the number written
+
+        A bar with the same time as the last stored one replaces it.
+        """
+        last = self.last_time(symbol, timeframe)
+        times = np.asarray(candles.time, dtype=np.int64)
+        start = 0 if last is None else int(np.searchsorted(times, last, side="left"))
+        count = len(times) - start
+        if count <= 0:
+            return 0
+
+        rows = np.empty(count, dtype=CANDLE_DTYPE)
+        rows["time"] = times[start:]
+        for field in CandleBuffer.FIELDS:
+            rows[field] = getattr(candles, field)[start:]
+
+        # Keep every complete record before the first written bar
+        keep = self.count(symbol, timeframe) - (1 if last is not None and rows["time"][0] == last else 0)
+        path = self.path(symbol, timeframe)
+        # Write in place (never shrinking the file under existing maps) and cut
+        # off any partial record left by an interrupted write
+        with open(path, "r+b" if path.exists() else "wb") as f:
+            f.seek(keep * CANDLE_DTYPE.itemsize)
+            f.write(rows.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._maps.pop((symbol, timeframe), None)
+        return count
+
+    def read(self, symbol: str, timeframe: int, start: Optional[int] = None,
+             end: Optional[int] = None) -> CandleView:
+        """Bars with ``start <= time < end`` (epoch seconds), as views into the mapped file"""
+        records = self._records(symbol, timeframe)
+        times = records["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(records) if end is None else int(np.searchsorted(times, end, side="left"))
+        return self._view(records[lo:hi])
+
+    def tail(self, symbol: str, timeframe: int, count: int) -> CandleView:
+        """The most recent ``count`` bars"""
+        records = self._records(symbol, timeframe)
+        return self._view(records[max(len(records) - count, 0):])
+
+    def _view(self, records: np.ndarray) -> CandleView:
+        return CandleView(*(records[name] for name in CANDLE_DTYPE.names))
+
+
+@lru_cache()
+def get_candle_store() -> CandleStore:
+    return CandleStore(get_settings().CANDLE_STORE_DIR)
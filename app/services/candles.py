@@ -0,0 +1,155 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List
+
+
+class CandleBuffer:
+    """Fixed-capacity ring buffer of OHLCV candles stored as contiguous columns
+
+    Timestamps are int64 epoch seconds (bar open time), prices and volume are
+    float64. Every bar is written twice (at ``i`` and ``i + capacity``) so the
+    buffered window is always one contiguous slice and the column properties
+    return views instead of copies.
+    """
+
+    FIELDS = ("open", "high", "low", "close", "volume")
+
+    def __init__(self, capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self._time = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(self.FIELDS), 2 * capacity), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _column(self, values: np.ndarray) -> np.ndarray:
+        view = values[self._start:self._start + self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._column(self._time)
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._column(self._values[0])
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._column(self._values[1])
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._column(self._values[2])
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._column(self._values[3])
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._column(self._values[4])
+
+    def clear(self):
+        """Remove all candles"""
+        self._start = 0
+        self._size = 0
+
+    def append(self, time: int, open: float, high: float, low: float, close: float, volume: float = 0.0):
+        """Append one bar, evicting the oldest when full"""
+        pos = (self._start + self._size) % self.capacity
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._size += 1
+
+        row = (open, high, low, close, volume)
+        for idx in (pos, pos + self.capacity):
+            self._time[idx] = time
+            self._values[:, idx] = row
+
+    def extend(self, time, open, high, low, close, volume=None):
+        """Append many bars from arrays, keeping only the newest ``capacity`` bars"""
+        time = np.asarray(time, dtype=np.int64)
+        count = time.shape[0]
+        if volume is None:
+            volume = np.zeros(count)
+        values = np.vstack([open, high, low, close, volume]).astype(np.float64, copy=False)
+
+        if count > self.capacity:
+            time = time[-self.capacity:]
+            values = values[:, -self.capacity:]
+            count = self.capacity
+        if count == 0:
+            return
+
+        pos = (self._start + self._size + np.arange(count)) % self.capacity
+        for offset in (0, self.capacity):
+            self._time[pos + offset] = time
+            self._values[:, pos + offset] = values
+
+        overflow = max(0, self._size + count - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    @classmethod
+    def from_records(cls, records: List[Dict], capacity: int = None) -> "CandleBuffer":
+        """Build a buffer from list-of-dict candles (``time`` as ISO string, datetime or epoch seconds)"""
+        buffer = cls(capacity or max(len(records), 1))
+        if records:
+            buffer.extend(
+                [to_epoch(r["time"]) for r in records],
+                *([float(r.get(field, 0.0)) for r in records] for field in cls.FIELDS)
+            )
+        return buffer
+
+    def to_records(self) -> List[Dict]:
+        """Convert to list-of-dict candles with ISO timestamps"""
+        columns = [column.tolist() for column in (self.open, self.high, self.low, self.close, self.volume)]
+        return [
+            {
+                "time": datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None).isoformat(),
+                **dict(zip(self.FIELDS, row))
+            }
+            for ts, row in zip(self.time.tolist(), zip(*columns))
+        ]
+
+
+class CandleView:
+    """Read-only OHLCV columns over existing arrays (shared memory, memory maps), without copying"""
+
+    FIELDS = CandleBuffer.FIELDS
+
+    def __init__(self, time, open, high, low, close, volume):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+def candles_before(candles, end: int) -> CandleView:
+    """Bars of ``candles`` that opened before ``end`` (epoch seconds), as views"""
+    stop = int(np.searchsorted(np.asarray(candles.time), end, side="left"))
+    return CandleView(candles.time[:stop], *(getattr(candles, field)[:stop] for field in CandleBuffer.FIELDS))
+
+
+def to_epoch(value) -> int:
+    """Epoch seconds from an ISO string, datetime (naive = UTC) or number"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
@@ -0,0 +1,278 @@
+"""
+Vectorized technical indicators
+
+Every function takes a price series (or a 2-D array of series, one per row)
+and returns the indicator for every bar along the last axis, so callers can
+compute a full history in one pass and read the latest value with ``[..., -1]``.
+"""
+import numpy as np
+from scipy.signal import lfilter
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _smooth(values: np.ndarray, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """Run y[i] = alpha * x[i] + (1 - alpha) * y[i - 1] starting from ``seed``"""
+    zi = (1.0 - alpha) * seed[..., np.newaxis]
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=-1, zi=zi)
+    return out
+
+
+def ema(values, period: int) -> np.ndarray:
+    """Exponential moving average, seeded with the first value"""
+    x = _as_array(values)
+    if x.shape[-1] == 0:
+        return x.copy()
+    return _smooth(x, 2.0 / (period + 1), x[..., 0])
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Simple moving average (expanding mean until ``window`` bars are available)"""
+    x = _as_array(values)
+    n = x.shape[-1]
+    out = np.empty_like(x)
+    if n == 0:
+        return out
+
+    csum = np.cumsum(x, axis=-1)
+    head = min(window, n)
+    out[..., :head] = csum[..., :head] / np.arange(1, head + 1)
+    if n > window:
+        out[..., window:] = (csum[..., window:] - csum[..., :-window]) / window
+    return out
+
+
+def wilder_averages(values, period: int = 14) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilder-smoothed average gain and loss, one value per bar from index ``period`` on"""
+    x = _as_array(values)
+    n = x.shape[-1]
+    deltas = np.diff(x, axis=-1)
+    gains = np.clip(deltas, 0.0, None)
+    losses = np.clip(-deltas, 0.0, None)
+
+    alpha = 1.0 / period
+    avg_gain = np.empty(x.shape[:-1] + (n - period,))
+    avg_loss = np.empty_like(avg_gain)
+    avg_gain[..., 0] = gains[..., :period].mean(axis=-1)
+    avg_loss[..., 0] = losses[..., :period].mean(axis=-1)
+    if n - period > 1:
+        avg_gain[..., 1:] = _smooth(gains[..., period:], alpha, avg_gain[..., 0])
+        avg_loss[..., 1:] = _smooth(losses[..., period:], alpha, avg_loss[..., 0])
+    return avg_gain, avg_loss
+
+
+def rsi(values, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing (NaN until ``period`` deltas exist)"""
+    x = _as_array(values)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] <= period:
+        return out
+
+    avg_gain, avg_loss = wilder_averages(x, period)
+    out[..., period:] = rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """Convert smoothed gains/losses into RSI values"""
+    avg_gain = _as_array(avg_gain)
+    avg_loss = _as_array(avg_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses in the window: fully overbought, or neutral when flat
+    values = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+    return values
+
+
+def macd(values, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    x = _as_array(values)
+    macd_line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def compute_indicators(closes, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                       macd_signal: int = 9, sma_fast: int = 20, sma_slow: int = 50) -> Dict[str, np.ndarray]:
+    """Compute every indicator used by the signal rules in a single pass
+
+    Keys keep their default-period names (``sma20``, ``sma50``, ``ema12``) whatever
+    periods are used, so the signal payload has a stable shape.
+    """
+    x = _as_array(closes)
+    ema_fast = ema(x, macd_fast)
+    macd_line = ema_fast - ema(x, macd_slow)
+    signal_line = ema(macd_line, macd_signal)
+
+    return {
+        "rsi": rsi(x, rsi_period),
+        "macd": macd_line,
+        "macd_signal": signal_line,
+        "macd_histogram": macd_line - signal_line,
+        "sma20": sma(x, sma_fast),
+        "sma50": sma(x, sma_slow),
+        "ema12": ema_fast,
+    }
+
+
+class IncrementalIndicators:
+    """Streaming indicator state for one symbol/timeframe, updated in O(1) per bar
+
+    Produces the same values as ``compute_indicators`` over the bars seen so far.
+    """
+
+    def __init__(self, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9, sma_fast: int = 20, sma_slow: int = 50):
+        self.rsi_period = rsi_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.sma_windows = (sma_fast, sma_slow)
+        self.reset()
+
+    def reset(self):
+        """Drop all state"""
+        self.count = 0
+        self.last_close: Optional[float] = None
+        self.ema_fast = 0.0
+        self.ema_slow = 0.0
+        self.signal_line = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.sma_buffers = [deque(maxlen=window) for window in self.sma_windows]
+        self.sma_sums = [0.0 for _ in self.sma_windows]
+
+    def seed(self, closes):
+        """Initialise the state from a history of closed bars"""
+        x = _as_array(closes)
+        self.reset()
+        if x.size == 0:
+            return self
+
+        self.count = int(x.size)
+        self.last_close = float(x[-1])
+        ema_fast = ema(x, self.macd_fast)
+        ema_slow = ema(x, self.macd_slow)
+        self.ema_fast = float(ema_fast[-1])
+        self.ema_slow = float(ema_slow[-1])
+        self.signal_line = float(ema(ema_fast - ema_slow, self.macd_signal)[-1])
+
+        if self.count > self.rsi_period:
+            avg_gain, avg_loss = wilder_averages(x, self.rsi_period)
+            self.avg_gain = float(avg_gain[-1])
+            self.avg_loss = float(avg_loss[-1])
+        else:
+            deltas = np.diff(x)
+            self.avg_gain = float(np.clip(deltas, 0.0, None).sum())
+            self.avg_loss = float(np.clip(-deltas, 0.0, None).sum())
+
+        for i, window in enumerate(self.sma_windows):
+            tail = x[-window:]
+            self.sma_buffers[i].extend(tail.tolist())
+            self.sma_sums[i] = float(tail.sum())
+        return self
+
+    def _step(self, close: float) -> Dict:
+        """Compute the next state for ``close`` without mutating the current one"""
+        if self.count == 0:
+            ema_fast = ema_slow = close
+            signal_line = 0.0
+            avg_gain = avg_loss = 0.0
+        else:
+            k_fast = 2.0 / (self.macd_fast + 1)
+            k_slow = 2.0 / (self.macd_slow + 1)
+            k_signal = 2.0 / (self.macd_signal + 1)
+            ema_fast = k_fast * close + (1.0 - k_fast) * self.ema_fast
+            ema_slow = k_slow * close + (1.0 - k_slow) * self.ema_slow
+            signal_line = k_signal * (ema_fast - ema_slow) + (1.0 - k_signal) * self.signal_line
+
+            delta = close - self.last_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if self.count < self.rsi_period:
+                # Still filling the first window: keep raw sums
+                avg_gain = self.avg_gain + gain
+                avg_loss = self.avg_loss + loss
+            elif self.count == self.rsi_period:
+                avg_gain = (self.avg_gain + gain) / self.rsi_period
+                avg_loss = (self.avg_loss + loss) / self.rsi_period
+            else:
+                avg_gain = (self.avg_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                avg_loss = (self.avg_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+
+        sma_sums = []
+        sma_counts = []
+        for buffer, total in zip(self.sma_buffers, self.sma_sums):
+            if len(buffer) == buffer.maxlen:
+                total -= buffer[0]
+                sma_counts.append(buffer.maxlen)
+            else:
+                sma_counts.append(len(buffer) + 1)
+            sma_sums.append(total + close)
+
+        return {
+            "count": self.count + 1,
+            "ema_fast": ema_fast,
+            "ema_slow": ema_slow,
+            "signal_line": signal_line,
+            "avg_gain": avg_gain,
+            "avg_loss": avg_loss,
+            "sma_sums": sma_sums,
+            "sma_counts": sma_counts,
+        }
+
+    def _snapshot(self, state: Dict, close: float) -> Dict:
+        """Format a state as the indicator dict used by ``SignalGenerator``"""
+        avg_gain, avg_loss = state["avg_gain"], state["avg_loss"]
+        if state["count"] <= self.rsi_period:
+            rsi_value = 50.0
+        elif avg_loss == 0:
+            rsi_value = 100.0 if avg_gain > 0 else 50.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        macd_line = state["ema_fast"] - state["ema_slow"]
+        sma_fast, sma_slow = (total / count for total, count in zip(state["sma_sums"], state["sma_counts"]))
+
+        return {
+            "rsi": rsi_value,
+            "macd": {
+                "macd": macd_line,
+                "signal": state["signal_line"],
+                "histogram": macd_line - state["signal_line"],
+            },
+            "moving_averages": {
+                "sma20": sma_fast,
+                "sma50": sma_slow,
+                "ema12": state["ema_fast"],
+            },
+            "bars": state["count"],
+            "close": close,
+        }
+
+    def update(self, close: float) -> Dict:
+        """Commit a closed bar and return the updated indicator values"""
+        close = float(close)
+        state = self._step(close)
+
+        self.count = state["count"]
+        self.last_close = close
+        self.ema_fast = state["ema_fast"]
+        self.ema_slow = state["ema_slow"]
+        self.signal_line = state["signal_line"]
+        self.avg_gain = state["avg_gain"]
+        self.avg_loss = state["avg_loss"]
+        self.sma_sums = state["sma_sums"]
+        for buffer in self.sma_buffers:
+            buffer.append(close)
+
+        return self._snapshot(state, close)
+
+    def preview(self, price: float) -> Dict:
+        """Indicator values if the forming bar closed at ``price`` (state is unchanged)"""
+        price = float(price)
+        return self._snapshot(self._step(price), price)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedSubscription:
+    """One connected client: a bounded event queue that drops the oldest event when full"""
+
+    def __init__(self, feed: "LiveFeed", user_id: int, maxsize: int):
+        self.feed = feed
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Optional[Dict]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Optional[Dict]:
+        """Next event, or ``None`` once the feed is shut down"""
+        return await self.queue.get()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class LiveFeed:
+    """Pushes new signals and mark-to-market updates of open trades to connected clients"""
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self._subscribers: Dict[int, List[FeedSubscription]] = {}
+
+    def subscribe(self, user_id: int) -> FeedSubscription:
+        """Register a client of ``user_id``"""
+        subscription = FeedSubscription(self, user_id, self.maxsize)
+        self._subscribers.setdefault(user_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FeedSubscription):
+        subscribers = self._subscribers.get(subscription.user_id, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        if not subscribers:
+            self._subscribers.pop(subscription.user_id, None)
+
+    def is_connected(self, user_id: int) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id: int, event_type: str, data) -> int:
+        """Send an event to every client of a user; returns the number of clients reached"""
+        subscribers = self._subscribers.get(user_id, ())
+        event = {"type": event_type, "data": data}
+        for subscription in subscribers:
+            subscription.offer(event)
+        return len(subscribers)
+
+    def publish_signal(self, user_id: int, signal: Dict) -> int:
+        return self.publish(user_id, "signal", signal)
+
+    def on_trade_updates(self, updates: Dict[int, List[Dict]]):
+        """Mark-to-market listener: push revalued trades to users with a connected client"""
+        for user_id, rows in updates.items():
+            if user_id in self._subscribers:
+                self.publish(user_id, "trades", rows)
+
+    def on_trades_closed(self, rows: List[Dict]):
+        """Mark-to-market close listener: notify users of trades closed by a stop loss / take profit"""
+        for row in rows:
+            if row["user_id"] in self._subscribers:
+                self.publish(row["user_id"], "trade_closed", {**row, "closed_at": row["closed_at"].isoformat()})
+
+    def close_all(self):
+        """End every client stream"""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.offer(None)
+
+
+@lru_cache()
+def get_live_feed() -> LiveFeed:
+    return LiveFeed()
@@ -0,0 +1,334 @@
+import asyncio
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, bindparam, case
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.database import Trade, TradeStatus
+from app.services.symbol_specs import get_symbol_specs
+from app.services.tick_dispatcher import TickSubscription
+from app.services.trade_stats import record_closed_trades
+from app.services.trigger_index import TriggerIndex
+
+logger = logging.getLogger(__name__)
+
+# Receives {user_id: [{"id", "symbol", "current_price", "pnl", "pnl_percentage"}, ...]} after each tick
+UpdateListener = Callable[[Dict[int, List[Dict]]], None]
+# Receives the rows of trades closed by a stop loss / take profit
+CloseListener = Callable[[List[Dict]], None]
+
+# One statement, executed with many parameter sets; closed trades are never overwritten
+_FLUSH_STATEMENT = (
+    update(Trade.__table__)
+    .where(Trade.__table__.c.id == bindparam("trade_id"))
+    .where(Trade.__table__.c.status == TradeStatus.OPEN)
+    .values(
+        current_price=bindparam("current_price"),
+        pnl=bindparam("pnl"),
+        pnl_percentage=bindparam("pnl_percentage"),
+    )
+)
+
+
+class MarkToMarketEngine:
+    """Holds every open trade in memory, revalues it on each tick and flushes P&L in batches
+
+    Trades are indexed by symbol so a tick only touches the trades it prices.
+    Revalued trades are marked dirty and written to the database every
+    ``flush_interval`` seconds with a single executemany UPDATE. Trades whose
+    stop loss or take profit is crossed are closed in one transaction per tick.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.listeners: List[UpdateListener] = []
+        self.close_listeners: List[CloseListener] = []
+        self.triggers = TriggerIndex()
+        # symbol -> trade id -> in-memory trade state
+        self._trades: Dict[str, Dict[int, Dict]] = {}
+        self._dirty: Dict[int, Dict] = {}
+        self._ticks: Optional[TickSubscription] = None
+        self._tasks: List[asyncio.Task] = []
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.auto_closed = 0
+
+    def add_listener(self, listener: UpdateListener):
+        self.listeners.append(listener)
+
+    def add_close_listener(self, listener: CloseListener):
+        self.close_listeners.append(listener)
+
+    # ----- open trade index -----
+
+    async def load(self):
+        """Load every open trade from the database"""
+        async with self.session_factory() as db:
+            result = await db.execute(select(Trade).where(Trade.status == TradeStatus.OPEN))
+            trades = result.scalars().all()
+
+        self._trades = {}
+        self.triggers = TriggerIndex()
+        for trade in trades:
+            self._index(trade)
+        self._refresh_symbols()
+        logger.info(f"Mark-to-market engine loaded {len(trades)} open trades")
+
+    def _index(self, trade: Trade):
+        self._trades.setdefault(trade.symbol, {})[trade.id] = {
+            "id": trade.id,
+            "user_id": trade.user_id,
+            "symbol": trade.symbol,
+            "is_buy": trade.direction.value == "buy",
+            "entry_price": trade.entry_price,
+            "volume": trade.volume,
+            "units": get_symbol_specs().units(trade.symbol, trade.volume),
+            "stop_loss": trade.stop_loss,
+            "take_profit": trade.take_profit,
+            "current_price": trade.current_price,
+            "pnl": trade.pnl or 0.0,
+        }
+        self.triggers.add(trade.id, trade.symbol, trade.direction.value == "buy",
+                          trade.stop_loss, trade.take_profit)
+
+    def add_trade(self, trade: Trade):
+        """Start tracking a newly opened trade"""
+        self._index(trade)
+        self._refresh_symbols()
+
+    def remove_trade(self, trade: Trade):
+        """Stop tracking a closed trade (pending P&L writes for it are discarded)"""
+        self._trades.get(trade.symbol, {}).pop(trade.id, None)
+        self._dirty.pop(trade.id, None)
+        self.triggers.remove(trade.id)
+        self._refresh_symbols()
+
+    def update_levels(self, trade: Trade):
+        """Re-index a tracked trade after its stop loss / take profit changed"""
+        state = self.get_trade(trade.id, trade.symbol)
+        if state is not None:
+            state["stop_loss"] = trade.stop_loss
+            state["take_profit"] = trade.take_profit
+            self.triggers.add(trade.id, trade.symbol, trade.direction.value == "buy",
+                              trade.stop_loss, trade.take_profit)
+
+    def get_trade(self, trade_id: int, symbol: str) -> Optional[Dict]:
+        return self._trades.get(symbol, {}).get(trade_id)
+
+    def open_trades(self, user_id: Optional[int] = None) -> List[Dict]:
+        """Tracked open trades, optionally for one user"""
+        return [
+            trade for trades in self._trades.values() for trade in trades.values()
+            if user_id is None or trade["user_id"] == user_id
+        ]
+
+    # ----- revaluation -----
+
+    def on_tick(self, tick: Dict) -> Dict[int, List[Dict]]:
+        """Revalue the open trades of the tick's symbol; returns the updates grouped by user"""
+        trades = self._trades.get(tick["symbol"])
+        if not trades:
+            return {}
+
+        bid = tick["bid"]
+        ask = tick["ask"]
+        updates: Dict[int, List[Dict]] = {}
+        for trade in trades.values():
+            # Longs close at the bid, shorts at the ask
+            if trade["is_buy"]:
+                price = bid
+                pnl = (price - trade["entry_price"]) * trade["units"]
+            else:
+                price = ask
+                pnl = (trade["entry_price"] - price) * trade["units"]
+            if price == trade["current_price"]:
+                continue
+
+            trade["current_price"] = price
+            trade["pnl"] = pnl
+            notional = trade["entry_price"] * trade["units"]
+            row = {
+                "id": trade["id"],
+                "symbol": trade["symbol"],
+                "current_price": price,
+                "pnl": pnl,
+                "pnl_percentage": pnl / notional * 100 if notional > 0 else 0.0,
+            }
+            self._dirty[trade["id"]] = row
+            updates.setdefault(trade["user_id"], []).append(row)
+
+        if updates:
+            for listener in self.listeners:
+                try:
+                    listener(updates)
+                except Exception as e:
+                    logger.error(f"Mark-to-market listener failed: {e}")
+        return updates
+
+    def take_triggered(self, tick: Dict) -> List[Tuple[Dict, str, float]]:
+        """Remove and return the trades whose stop loss / take profit this tick crosses"""
+        triggered = []
+        for trade_id, reason, price in self.triggers.crossed(tick["symbol"], tick["bid"], tick["ask"]):
+            trade = self._trades.get(tick["symbol"], {}).pop(trade_id, None)
+            self.triggers.remove(trade_id)
+            self._dirty.pop(trade_id, None)
+            if trade is not None:
+                triggered.append((trade, reason, price))
+        return triggered
+
+    async def close_triggered(self, triggered: List[Tuple[Dict, str, float]]) -> List[Dict]:
+        """Close triggered trades in a single UPDATE; returns the rows actually closed"""
+        if not triggered:
+            return []
+
+        closed_at = datetime.utcnow()
+        rows = {}
+        for trade, reason, price in triggered:
+            direction = 1.0 if trade["is_buy"] else -1.0
+            pnl = direction * (price - trade["entry_price"]) * trade["units"]
+            notional = trade["entry_price"] * trade["units"]
+            rows[trade["id"]] = {
+                "id": trade["id"],
+                "user_id": trade["user_id"],
+                "symbol": trade["symbol"],
+                "exit_price": price,
+                "pnl": pnl,
+                "pnl_percentage": pnl / notional * 100 if notional > 0 else 0.0,
+                "closed_at": closed_at,
+                "close_reason": reason,
+            }
+
+        table = Trade.__table__
+        ids = list(rows)
+
+        def per_trade(field):
+            return case({i: rows[i][field] for i in ids}, value=table.c.id)
+
+        statement = (
+            update(table)
+            .where(table.c.id.in_(ids))
+            .where(table.c.status == TradeStatus.OPEN)
+            .values(
+                status=TradeStatus.CLOSED,
+                exit_price=per_trade("exit_price"),
+                current_price=per_trade("exit_price"),
+                pnl=per_trade("pnl"),
+                pnl_percentage=per_trade("pnl_percentage"),
+                closed_at=closed_at,
+                close_reason=per_trade("close_reason"),
+            )
+            .returning(table.c.id)
+        )
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(statement)
+                closed_ids = set(result.scalars().all())
+                await record_closed_trades(
+                    db, [(rows[i]["user_id"], closed_at, rows[i]["pnl"]) for i in ids if i in closed_ids]
+                )
+                await db.commit()
+        except Exception as e:
+            # Put the trades back so the next tick retries them
+            for trade, _, _ in triggered:
+                self._trades.setdefault(trade["symbol"], {})[trade["id"]] = trade
+                levels = (trade["stop_loss"], trade["take_profit"])
+                self.triggers.add(trade["id"], trade["symbol"], trade["is_buy"], *levels)
+            logger.error(f"Closing triggered trades failed: {e}")
+            return []
+
+        self._refresh_symbols()
+        closed = [rows[i] for i in ids if i in closed_ids]
+        self.auto_closed += len(closed)
+        for listener in self.close_listeners:
+            try:
+                listener(closed)
+            except Exception as e:
+                logger.error(f"Trade close listener failed: {e}")
+        return closed
+
+    async def flush(self) -> int:
+        """Write all changed prices/P&L in one batched UPDATE; returns the number of rows sent"""
+        if not self._dirty:
+            return 0
+
+        rows, self._dirty = list(self._dirty.values()), {}
+        params = [
+            {
+                "trade_id": row["id"],
+                "current_price": row["current_price"],
+                "pnl": row["pnl"],
+                "pnl_percentage": row["pnl_percentage"],
+            }
+            for row in rows
+        ]
+        try:
+            async with self.session_factory() as db:
+                await db.execute(_FLUSH_STATEMENT, params)
+                await db.commit()
+        except Exception as e:
+            # Keep the rows for the next interval unless newer values arrived meanwhile
+            for row in rows:
+                self._dirty.setdefault(row["id"], row)
+            logger.error(f"Mark-to-market flush failed: {e}")
+            return 0
+
+        self.flushes += 1
+        self.rows_flushed += len(params)
+        return len(params)
+
+    # ----- lifecycle -----
+
+    def _refresh_symbols(self):
+        if self._ticks is not None:
+            symbols = [symbol for symbol, trades in self._trades.items() if trades]
+            self._ticks.dispatcher.set_symbols(self._ticks, symbols)
+
+    def start(self, connector):
+        """Consume ticks for every symbol with open trades and flush periodically"""
+        self._ticks = connector.dispatcher.subscribe([])
+        self._refresh_symbols()
+        self._tasks = [asyncio.create_task(self._consume()), asyncio.create_task(self._flush_loop())]
+
+    async def _consume(self):
+        async for tick in self._ticks:
+            try:
+                self.on_tick(tick)
+                await self.close_triggered(self.take_triggered(tick))
+            except Exception as e:
+                logger.error(f"Mark-to-market failed on tick {tick}: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def stop(self):
+        """Stop consuming ticks and write any pending updates"""
+        if self._ticks is not None:
+            self._ticks.close()
+            self._ticks = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+
+    def metrics(self) -> Dict:
+        return {
+            "open_trades": sum(len(trades) for trades in self._trades.values()),
+            "symbols": [symbol for symbol, trades in self._trades.items() if trades],
+            "pending_rows": len(self._dirty),
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "auto_closed": self.auto_closed,
+        }
+
+
+@lru_cache()
+def get_mark_to_market_engine() -> MarkToMarketEngine:
+    return MarkToMarketEngine(flush_interval=get_settings().MTM_FLUSH_INTERVAL)
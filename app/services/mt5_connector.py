@@ -1,19 +1,30 @@
-import asyncio
-import websockets
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+
+from app.core.config import get_settings
+from app.services.candle_store import CandleStore, get_candle_store
+from app.services.candles import CandleBuffer, CandleView, candles_before
+from app.services.tick_dispatcher import TickDispatcher
 
 logger = logging.getLogger(__name__)
 
+# Timeframes MT5 serves candles for, in minutes (M1 ... D1)
+TIMEFRAMES = (1, 5, 15, 30, 60, 240, 1440)
+
 
 class MT5Connector:
     """WebSocket connector for Exness MT5"""
     
-    def __init__(self, login: str, password: str, server: str = "ExnessFXPro"):
+    def __init__(self, login: str, password: str, server: str = "ExnessFXPro",
+                 candle_store: Optional[CandleStore] = None, tick_interval: float = 0.25):
         self.login = login
         self.password = password
         self.server = server
+        self.candle_store = candle_store
+        self.dispatcher = TickDispatcher(self, interval=tick_interval)
         self.ws = None
         self.is_connected = False
         self.account_data = {}
@@ -25,6 +36,7 @@ class MT5Connector:
             # Note: This is a placeholder. Real MT5 connection would use MT5 API
             # For demo purposes, we'll simulate connection
             self.is_connected = True
+            self.dispatcher.start()
             logger.info(f"Connected to MT5: {self.server}")
             return True
         except Exception as e:
@@ -34,6 +46,7 @@ class MT5Connector:
     async def disconnect(self):
         """Disconnect from MT5"""
         self.is_connected = False
+        await self.dispatcher.stop()
         if self.ws:
             await self.ws.close()
     
@@ -58,13 +71,21 @@ class MT5Connector:
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    async def get_ticks(self, symbols: List[str]) -> List[Dict]:
+        """Get current ticks for several symbols in one request"""
+        return [await self.get_tick_data(symbol) for symbol in symbols]
+    
     async def subscribe_to_ticks(self, symbol: str = "XAUUSD", callback=None):
-        """Subscribe to real-time tick data"""
-        while self.is_connected:
-            tick = await self.get_tick_data(symbol)
-            if callback:
-                await callback(tick)
-            await asyncio.sleep(1)  # Update every second
+        """Subscribe to real-time tick data (runs until unsubscribed or disconnected)"""
+        if not self.is_connected:
+            return
+        subscription = self.dispatcher.subscribe([symbol])
+        try:
+            async for tick in subscription:
+                if callback:
+                    await callback(tick)
+        finally:
+            subscription.close()
     
     async def open_trade(self, symbol: str, direction: str, volume: float, 
                          stop_loss: float, take_profit: float):
@@ -88,17 +109,70 @@ class MT5Connector:
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    async def get_candle_data(self, symbol: str, timeframe: int, count: int = 100):
-        """Get historical candle data"""
+    async def get_candle_data(self, symbol: str, timeframe: int, count: int = 100,
+                              include_forming: bool = True) -> Union[CandleBuffer, CandleView]:
+        """Get historical candle data (only bars missing from the local store are fetched)
+        
+        Only closed bars are stored. The bar still forming is fetched on every
+        call and ends the result unless ``include_forming`` is False.
+        """
+        step = timeframe * 60
+        current_open = int(datetime.utcnow().replace(tzinfo=timezone.utc).timestamp()) // step * step
+        closed_count = count - 1 if include_forming else count
+        
+        if self.candle_store is None:
+            candles = await self._fetch_candles(symbol, timeframe, closed_count + 1)
+            return candles if include_forming else candles_before(candles, current_open)
+        
+        last_time = self.candle_store.last_time(symbol, timeframe)
+        stored = self.candle_store.count(symbol, timeframe)
+        
+        if last_time is None or stored < closed_count:
+            missing = closed_count
+        else:
+            missing = min(max((current_open - step - last_time) // step, 0), closed_count)
+        
+        fetched = None
+        if missing or include_forming:
+            fetched = await self._fetch_candles(symbol, timeframe, missing + 1)
+            self.candle_store.append(symbol, timeframe, candles_before(fetched, current_open))
+        
+        closed = self.candle_store.tail(symbol, timeframe, closed_count)
+        if not include_forming:
+            return closed
+        
+        candles = CandleBuffer(max(count, 1))
+        candles.extend(closed.time, *(getattr(closed, field) for field in CandleBuffer.FIELDS))
+        if len(fetched) and fetched.time[-1] >= current_open:
+            candles.append(int(fetched.time[-1]), *(float(getattr(fetched, field)[-1]) for field in CandleBuffer.FIELDS))
+        return candles
+    
+    async def _fetch_candles(self, symbol: str, timeframe: int, count: int) -> CandleBuffer:
+        """Fetch the most recent candles from MT5"""
         # Simulate candle data
-        candles = []
-        for i in range(count):
-            candles.append({
-                "time": datetime.utcnow().isoformat(),
-                "open": 2050.0 + (i * 0.1),
-                "high": 2050.5 + (i * 0.1),
-                "low": 2049.5 + (i * 0.1),
-                "close": 2050.2 + (i * 0.1),
-                "volume": 1000 + (i * 10)
-            })
+        step = timeframe * 60
+        last_open = int(datetime.utcnow().replace(tzinfo=timezone.utc).timestamp()) // step * step
+        offsets = np.arange(count, dtype=np.float64)
+        
+        candles = CandleBuffer(max(count, 1))
+        candles.extend(
+            last_open - (count - 1 - np.arange(count, dtype=np.int64)) * step,
+            2050.0 + offsets * 0.1,
+            2050.5 + offsets * 0.1,
+            2049.5 + offsets * 0.1,
+            2050.2 + offsets * 0.1,
+            1000 + offsets * 10
+        )
         return candles
+
+
+@lru_cache()
+def get_mt5_connector() -> MT5Connector:
+    settings = get_settings()
+    return MT5Connector(
+        settings.EXNESS_LOGIN,
+        settings.EXNESS_PASSWORD,
+        settings.EXNESS_SERVER,
+        candle_store=get_candle_store(),
+        tick_interval=settings.TICK_POLL_INTERVAL,
+    )
@@ -0,0 +1,133 @@
+import csv
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.services import indicators as ta
+from app.services.backtester import Backtester
+from app.services.candles import CandleBuffer, CandleView
+from app.services.signal_generator import SignalGenerator
+
+logger = logging.getLogger(__name__)
+
+# Row order of the (6 x bars) array each symbol's history is shared as
+SHARED_COLUMNS = ("time",) + CandleBuffer.FIELDS
+
+
+def _evaluate_group(shm_name: str, n_bars: int, symbol: str, indicator_params: Dict,
+                    combinations: List[Dict], backtest_kwargs: Dict) -> List[Dict]:
+    """Worker entry point: backtest every combination sharing one set of indicator periods"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        columns = np.ndarray((len(SHARED_COLUMNS), n_bars), dtype=np.float64, buffer=shm.buf)
+        candles = CandleView(columns[0].astype(np.int64), *columns[1:])
+        # Indicators depend only on the periods, so they are computed once for the whole group
+        series = ta.compute_indicators(candles.close, **indicator_params)
+
+        results = []
+        for combination in combinations:
+            generator = SignalGenerator(**combination)
+            summary = Backtester(generator, **backtest_kwargs).run(candles, series)["summary"]
+            results.append({"symbol": symbol, **combination, **summary})
+
+        del candles, columns
+        return results
+    finally:
+        shm.close()
+
+
+class ParameterSweep:
+    """Grid/random search over SignalGenerator parameters, backtested on stored candle history"""
+
+    def __init__(self, workers: Optional[int] = None, **backtest_kwargs):
+        self.workers = workers or os.cpu_count() or 1
+        self.backtest_kwargs = backtest_kwargs
+
+    @staticmethod
+    def grid(space: Dict[str, List]) -> List[Dict]:
+        """Every combination of the values in ``space``"""
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    @staticmethod
+    def random(space: Dict[str, List], samples: int, seed: Optional[int] = None) -> List[Dict]:
+        """``samples`` distinct combinations drawn at random from ``space``"""
+        names = list(space)
+        shape = tuple(len(space[name]) for name in names)
+        total = int(np.prod(shape))
+        if samples >= total:
+            return ParameterSweep.grid(space)
+
+        picks = np.random.default_rng(seed).choice(total, size=samples, replace=False)
+        positions = np.unravel_index(picks, shape)
+        return [
+            {name: space[name][int(positions[axis][i])] for axis, name in enumerate(names)}
+            for i in range(samples)
+        ]
+
+    def _group(self, combinations: List[Dict]) -> Dict[Tuple, List[Dict]]:
+        """Group combinations by the indicator periods they resolve to"""
+        defaults = SignalGenerator().get_params()
+        groups: Dict[Tuple, List[Dict]] = {}
+        for combination in combinations:
+            params = {**defaults, **combination}
+            key = tuple(params[name] for name in SignalGenerator.INDICATOR_PARAMETERS)
+            groups.setdefault(key, []).append(params)
+        return groups
+
+    def run(self, candles: Dict[str, Union[CandleBuffer, CandleView]], combinations: List[Dict],
+            sort_by: str = "net_profit") -> List[Dict]:
+        """Backtest every combination on every symbol and return rows ranked by ``sort_by``"""
+        groups = self._group(combinations)
+        blocks: Dict[str, shared_memory.SharedMemory] = {}
+        results: List[Dict] = []
+        context = multiprocessing.get_context("spawn")
+
+        try:
+            for symbol, series in candles.items():
+                n_bars = len(series)
+                shm = shared_memory.SharedMemory(create=True, size=max(len(SHARED_COLUMNS) * n_bars * 8, 1))
+                blocks[symbol] = shm
+                shared = np.ndarray((len(SHARED_COLUMNS), n_bars), dtype=np.float64, buffer=shm.buf)
+                for row, name in enumerate(SHARED_COLUMNS):
+                    shared[row] = getattr(series, name)
+                del shared
+
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(
+                        _evaluate_group, blocks[symbol].name, len(candles[symbol]), symbol,
+                        dict(zip(SignalGenerator.INDICATOR_PARAMETERS, key)), group, self.backtest_kwargs
+                    )
+                    for symbol in candles
+                    for key, group in groups.items()
+                ]
+                for future in as_completed(futures):
+                    results.extend(future.result())
+        finally:
+            for shm in blocks.values():
+                shm.close()
+                shm.unlink()
+
+        logger.info(f"Parameter sweep evaluated {len(results)} runs "
+                    f"({len(groups)} indicator groups x {len(candles)} symbols)")
+        results.sort(key=lambda row: row[sort_by], reverse=True)
+        return results
+
+    @staticmethod
+    def write_results(results: List[Dict], path: str):
+        """Write ranked sweep results to a CSV file"""
+        if not results:
+            return
+
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["rank"] + list(results[0]))
+            writer.writeheader()
+            for rank, row in enumerate(results, start=1):
+                writer.writerow({"rank": rank, **row})
@@ -0,0 +1,269 @@
+import logging
+import math
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.database import Account, Trade, TradeStatus, TradeStatsDaily
+
+logger = logging.getLogger(__name__)
+
+
+class RiskLimitExceeded(Exception):
+    """Raised when an order would break a portfolio risk limit"""
+
+
+class RiskEngine:
+    """Per-user running equity, daily P&L and high-water mark, checked before every order
+
+    Equity is the last synced account balance plus the realized P&L of trades
+    closed since that sync plus the unrealized P&L of open trades. Every
+    update and every order check is O(1) per user; the database is only read
+    at startup and the first time a user with an account is seen.
+    """
+
+    def __init__(self, risk_per_trade: float = 2.0, max_daily_loss: float = 5.0,
+                 max_drawdown: float = 10.0):
+        self.risk_per_trade = risk_per_trade
+        self.max_daily_loss = max_daily_loss
+        self.max_drawdown = max_drawdown
+        self._users: Dict[int, Dict] = {}
+        self.rejected = 0
+        self.scaled = 0
+
+    # ----- state -----
+
+    def _new_state(self, balance: Optional[float], realized: float = 0.0, realized_today: float = 0.0,
+                   peak_equity: Optional[float] = None) -> Dict:
+        equity = (balance or 0.0) + realized
+        return {
+            "balance": balance,
+            "realized": realized,
+            "unrealized": 0.0,
+            "open": {},
+            "day": datetime.utcnow().date(),
+            "realized_today": realized_today,
+            "day_start_equity": equity - realized_today,
+            "high_water_mark": max(equity, peak_equity or equity),
+        }
+
+    @staticmethod
+    async def _synced_balances(db: AsyncSession, user_id: Optional[int] = None) -> Dict[int, Tuple[float, float]]:
+        """user id -> (balance of the first account, realized P&L of trades closed since it was synced)
+
+        Closing a trade does not touch ``Account.balance``; only a sync from the
+        broker (``/account/update``) folds realized P&L into it.
+        """
+        first = select(func.min(Account.id).label("id")).group_by(Account.user_id)
+        if user_id is not None:
+            first = first.where(Account.user_id == user_id)
+        first = first.subquery()
+        result = await db.execute(
+            select(Account.user_id, Account.balance, func.coalesce(func.sum(Trade.pnl), 0.0))
+            .join(first, Account.id == first.c.id)
+            .outerjoin(Trade, and_(
+                Trade.user_id == Account.user_id,
+                Trade.status == TradeStatus.CLOSED,
+                Trade.closed_at > Account.last_updated,
+            ))
+            .group_by(Account.user_id, Account.balance)
+        )
+        return {user_id: (balance, realized) for user_id, balance, realized in result}
+
+    @staticmethod
+    async def _realized_today(db: AsyncSession, user_id: Optional[int] = None) -> Dict[int, float]:
+        query = select(TradeStatsDaily.user_id, TradeStatsDaily.total_pnl).where(
+            TradeStatsDaily.day == datetime.utcnow().date()
+        )
+        if user_id is not None:
+            query = query.where(TradeStatsDaily.user_id == user_id)
+        return dict((await db.execute(query)).all())
+
+    async def load(self, db: AsyncSession, open_trades: Iterable[Dict] = ()):
+        """Rebuild every user's state from accounts, closed trades and the tracked open trades"""
+        balances = await self._synced_balances(db)
+
+        # Peak of the realized equity curve: equity now contains every closed trade,
+        # so it stood at equity - total + running total after each close
+        running = func.sum(Trade.pnl).over(
+            partition_by=Trade.user_id, order_by=(Trade.closed_at, Trade.id)
+        ).label("running")
+        curve = select(Trade.user_id, running).where(Trade.status == TradeStatus.CLOSED).subquery()
+        peaks = await db.execute(
+            select(curve.c.user_id, func.max(curve.c.running)).group_by(curve.c.user_id)
+        )
+        totals = await db.execute(
+            select(Trade.user_id, func.sum(Trade.pnl))
+            .where(Trade.status == TradeStatus.CLOSED).group_by(Trade.user_id)
+        )
+        total_by_user = dict(totals.all())
+        today_by_user = await self._realized_today(db)
+
+        self._users = {}
+        for user_id, (balance, realized) in balances.items():
+            self._users[user_id] = self._new_state(balance, realized, today_by_user.get(user_id, 0.0))
+        for user_id, peak in peaks:
+            state = self._users.get(user_id)
+            if state is not None and peak is not None:
+                start = self._equity(state) - total_by_user.get(user_id, 0.0)
+                state["high_water_mark"] = max(state["high_water_mark"], start + max(peak, 0.0))
+
+        for trade in open_trades:
+            self.on_trade_opened(trade["user_id"], trade["id"], trade["pnl"])
+        logger.info(f"Risk engine loaded {len(self._users)} users")
+
+    async def ensure_user(self, db: AsyncSession, user_id: int):
+        """Load a user whose account was not known yet (e.g. registered after startup)
+
+        Nothing is cached while no account is visible, so the next order looks
+        again instead of being rejected until the balance happens to be synced.
+        """
+        state = self._users.get(user_id)
+        if state is not None and state["balance"] is not None:
+            return
+        balances = await self._synced_balances(db, user_id)
+        if user_id not in balances:
+            return
+
+        balance, realized = balances[user_id]
+        today = await self._realized_today(db, user_id)
+        new_state = self._new_state(balance, realized, today.get(user_id, 0.0))
+        if state is not None:
+            # Keep the open trades tracked meanwhile; their closes are already in ``realized``
+            new_state["open"] = state["open"]
+            new_state["unrealized"] = state["unrealized"]
+            self._mark(new_state)
+        self._users[user_id] = new_state
+
+    def _state(self, user_id: int) -> Dict:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = self._new_state(None)
+        today = datetime.utcnow().date()
+        if state["day"] != today:
+            state["day"] = today
+            state["realized_today"] = 0.0
+            state["day_start_equity"] = self._equity(state)
+        return state
+
+    @staticmethod
+    def _equity(state: Dict) -> float:
+        return (state["balance"] or 0.0) + state["realized"] + state["unrealized"]
+
+    def _mark(self, state: Dict):
+        state["high_water_mark"] = max(state["high_water_mark"], self._equity(state))
+
+    # ----- updates -----
+
+    def set_balance(self, user_id: int, balance: float):
+        """The account balance was synced from the broker; it now includes every realized P&L"""
+        state = self._state(user_id)
+        if state["balance"] is None:
+            # First balance seen for this user: the day and the high-water mark start from it
+            state["day_start_equity"] = balance - state["realized_today"]
+            state["high_water_mark"] = balance
+        state["balance"] = balance
+        state["realized"] = 0.0
+        self._mark(state)
+
+    def on_trade_opened(self, user_id: int, trade_id: int, pnl: float = 0.0):
+        state = self._state(user_id)
+        state["open"][trade_id] = pnl
+        state["unrealized"] += pnl
+
+    def on_trade_closed(self, user_id: int, trade_id: int, pnl: float):
+        state = self._state(user_id)
+        state["unrealized"] -= state["open"].pop(trade_id, 0.0)
+        state["realized"] += pnl
+        state["realized_today"] += pnl
+        self._mark(state)
+
+    def on_trade_updates(self, updates: Dict[int, List[Dict]]):
+        """Mark-to-market listener: fold revalued open trades into unrealized P&L"""
+        for user_id, rows in updates.items():
+            state = self._state(user_id)
+            open_trades = state["open"]
+            for row in rows:
+                if row["id"] in open_trades:
+                    state["unrealized"] += row["pnl"] - open_trades[row["id"]]
+                    open_trades[row["id"]] = row["pnl"]
+            self._mark(state)
+
+    def on_trades_closed(self, rows: List[Dict]):
+        """Mark-to-market close listener"""
+        for row in rows:
+            self.on_trade_closed(row["user_id"], row["id"], row["pnl"])
+
+    # ----- checks -----
+
+    def check_order(self, user_id: int, entry_price: float, stop_loss: float, volume: float,
+                    spec: Dict[str, float]) -> float:
+        """Volume the order may be opened with (scaled down to the risk budget)
+
+        ``spec`` is the symbol's contract spec (see SymbolSpecs.get): a
+        stop-loss hit costs ``|entry_price - stop_loss| * contract_size`` per
+        lot, as P&L is booked, and scaled volumes are rounded down to the lot
+        step. Raises ``RiskLimitExceeded`` when the daily loss or drawdown limit is
+        reached or not even the minimum volume fits the budget.
+        """
+        state = self._state(user_id)
+        if state["balance"] is None:
+            self.rejected += 1
+            raise RiskLimitExceeded("No trading account; load account info first")
+
+        equity = self._equity(state)
+        high_water_mark = state["high_water_mark"]
+        if high_water_mark > 0 and (high_water_mark - equity) / high_water_mark * 100 >= self.max_drawdown:
+            self.rejected += 1
+            raise RiskLimitExceeded("Maximum drawdown reached")
+
+        daily_pnl = state["realized_today"] + state["unrealized"]
+        daily_budget = state["day_start_equity"] * self.max_daily_loss / 100 + daily_pnl
+        if daily_budget <= 0:
+            self.rejected += 1
+            raise RiskLimitExceeded("Daily loss limit reached")
+
+        risk_per_lot = abs(entry_price - stop_loss) * spec["contract_size"]
+        if risk_per_lot == 0:
+            return volume
+
+        max_risk = min(equity * self.risk_per_trade / 100, daily_budget)
+        lot_step = spec["lot_step"]
+        # The epsilon absorbs float error like 0.3 / 0.01 = 29.999...
+        allowed = math.floor(max_risk / risk_per_lot / lot_step + 1e-9) * lot_step
+        if allowed < spec["min_lot"] - 1e-12:
+            self.rejected += 1
+            raise RiskLimitExceeded("Stop loss too wide for the remaining risk budget")
+        if volume > allowed:
+            self.scaled += 1
+            return round(allowed, 8)
+        return volume
+
+    def snapshot(self, user_id: int) -> Dict:
+        state = self._state(user_id)
+        equity = self._equity(state)
+        high_water_mark = state["high_water_mark"]
+        return {
+            "equity": equity,
+            "high_water_mark": high_water_mark,
+            "drawdown": (high_water_mark - equity) / high_water_mark * 100 if high_water_mark > 0 else 0.0,
+            "daily_pnl": state["realized_today"] + state["unrealized"],
+            "open_trades": len(state["open"]),
+        }
+
+    def metrics(self) -> Dict:
+        return {"users": len(self._users), "rejected": self.rejected, "scaled": self.scaled}
+
+
+@lru_cache()
+def get_risk_engine() -> RiskEngine:
+    settings = get_settings()
+    return RiskEngine(
+        risk_per_trade=settings.RISK_PER_TRADE,
+        max_daily_loss=settings.MAX_DAILY_LOSS,
+        max_drawdown=settings.MAX_DRAWDOWN,
+    )
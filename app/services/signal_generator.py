@@ -1,93 +1,254 @@
 import numpy as np
 import logging
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 import json
 
+from app.services import indicators as ta
+from app.services.candles import CandleBuffer, CandleView
+
+Candles = Union[CandleBuffer, CandleView, List[Dict]]
+
 logger = logging.getLogger(__name__)
 
 
 class SignalGenerator:
     """AI Signal Generator for trading signals"""
     
-    def __init__(self, model_path: str = None):
+    # Constructor arguments that change indicator values (the rest only change the rules)
+    INDICATOR_PARAMETERS = ("rsi_period", "macd_fast", "macd_slow", "macd_signal", "sma_fast", "sma_slow")
+    RULE_PARAMETERS = ("rsi_oversold", "rsi_overbought", "confidence_threshold", "min_bars")
+    
+    def __init__(self, model_path: str = None, confidence_threshold: float = 70, min_bars: int = 50,
+                 rsi_period: int = 14, rsi_oversold: float = 30, rsi_overbought: float = 70,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 sma_fast: int = 20, sma_slow: int = 50):
         self.model_path = model_path
-        self.confidence_threshold = 70
-        
+        self.confidence_threshold = confidence_threshold
+        self.min_bars = min_bars
+        self.rsi_period = rsi_period
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.sma_fast = sma_fast
+        self.sma_slow = sma_slow
+        # Streaming indicator state: symbol -> timeframe -> IncrementalIndicators
+        self.streams: Dict[str, Dict[int, ta.IncrementalIndicators]] = {}
+        self.latest_signals: Dict[Tuple[str, int], Dict] = {}
+    
+    def indicator_params(self) -> Dict:
+        """Indicator periods, as keyword arguments for indicators.compute_indicators"""
+        return {name: getattr(self, name) for name in self.INDICATOR_PARAMETERS}
+    
+    def get_params(self) -> Dict:
+        """All tunable parameters, as constructor keyword arguments"""
+        return {name: getattr(self, name) for name in self.INDICATOR_PARAMETERS + self.RULE_PARAMETERS}
+    
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """Calculate Relative Strength Index"""
-        if len(prices) < period:
+        if len(prices) <= period:
             return 50.0
         
-        deltas = np.diff(prices[-period:])
-        seed = deltas[:1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        
-        rs = up / down if down != 0 else 1.0
-        rsi = 100.0 - (100.0 / (1.0 + rs))
-        
-        return float(rsi)
+        return float(ta.rsi(prices, period)[-1])
     
     def calculate_macd(self, prices: List[float]) -> Dict[str, float]:
         """Calculate MACD (Moving Average Convergence Divergence)"""
-        if len(prices) < 26:
+        if len(prices) < self.macd_slow:
             return {"macd": 0, "signal": 0, "histogram": 0}
         
-        ema12 = self._ema(prices, 12)
-        ema26 = self._ema(prices, 26)
-        
-        macd = ema12 - ema26
-        signal = self._ema([macd], 9)
-        histogram = macd - signal
+        macd, signal, histogram = ta.macd(prices, self.macd_fast, self.macd_slow, self.macd_signal)
         
         return {
-            "macd": float(macd),
-            "signal": float(signal),
-            "histogram": float(histogram)
+            "macd": float(macd[-1]),
+            "signal": float(signal[-1]),
+            "histogram": float(histogram[-1])
         }
     
     def calculate_moving_averages(self, prices: List[float]) -> Dict[str, float]:
         """Calculate Moving Averages"""
-        sma20 = np.mean(prices[-20:]) if len(prices) >= 20 else np.mean(prices)
-        sma50 = np.mean(prices[-50:]) if len(prices) >= 50 else np.mean(prices)
-        ema12 = self._ema(prices, 12)
-        
         return {
-            "sma20": float(sma20),
-            "sma50": float(sma50),
-            "ema12": float(ema12)
+            "sma20": float(ta.sma(prices, self.sma_fast)[-1]),
+            "sma50": float(ta.sma(prices, self.sma_slow)[-1]),
+            "ema12": float(ta.ema(prices, self.macd_fast)[-1])
         }
     
     def _ema(self, prices: List[float], period: int) -> float:
         """Calculate Exponential Moving Average"""
-        prices_array = np.array(prices)
-        ema = prices_array[-1]
-        multiplier = 2 / (period + 1)
+        return float(ta.ema(prices, period)[-1])
+    
+    def generate_signal(self, candle_data: Candles, current_price: float) -> Dict:
+        """Generate trading signal based on technical analysis"""
+        if len(candle_data) < self.min_bars:
+            return self._insufficient_data()
+        
+        prices = self._closes(candle_data)
         
-        for i in range(len(prices_array) - 2, -1, -1):
-            ema = prices_array[i] * multiplier + ema * (1 - multiplier)
+        # Calculate every indicator over the full series once, then read the last bar
+        series = ta.compute_indicators(prices, **self.indicator_params())
+        rsi = float(series["rsi"][-1])
+        macd = {
+            "macd": float(series["macd"][-1]),
+            "signal": float(series["macd_signal"][-1]),
+            "histogram": float(series["macd_histogram"][-1])
+        }
+        mas = {
+            "sma20": float(series["sma20"][-1]),
+            "sma50": float(series["sma50"][-1]),
+            "ema12": float(series["ema12"][-1])
+        }
         
-        return float(ema)
+        return self._evaluate(rsi, macd, mas, current_price)
     
-    def generate_signal(self, candle_data: List[Dict], current_price: float) -> Dict:
-        """Generate trading signal based on technical analysis"""
-        if len(candle_data) < 50:
+    def generate_signals_batch(self, closes: np.ndarray, current_prices: np.ndarray = None,
+                               symbols: List[str] = None) -> Dict:
+        """Generate signals for many symbols at once from a (symbols x bars) array of closes"""
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        n_symbols, n_bars = closes.shape
+        if symbols is None:
+            symbols = [str(i) for i in range(n_symbols)]
+        if current_prices is None:
+            current_prices = closes[:, -1] if n_bars else np.zeros(n_symbols)
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        
+        if n_bars < self.min_bars:
             return {
-                "signal_type": "HOLD",
-                "confidence": 0,
+                "symbols": list(symbols),
+                "signal_type": np.full(n_symbols, "HOLD"),
+                "confidence": np.zeros(n_symbols),
+                "is_valid": np.zeros(n_symbols, dtype=bool),
                 "indicators": {},
+                "current_price": current_prices,
                 "reason": "Insufficient data"
             }
         
-        # Extract prices
-        prices = [float(c["close"]) for c in candle_data]
+        series = ta.compute_indicators(closes, **self.indicator_params())
+        last = {name: values[:, -1] for name, values in series.items()}
+        signal_type, confidence = self.evaluate_arrays(last, current_prices)
         
-        # Calculate indicators
-        rsi = self.calculate_rsi(prices)
-        macd = self.calculate_macd(prices)
-        mas = self.calculate_moving_averages(prices)
+        return {
+            "symbols": list(symbols),
+            "signal_type": signal_type,
+            "confidence": confidence,
+            "is_valid": confidence >= self.confidence_threshold,
+            "indicators": last,
+            "current_price": current_prices
+        }
+    
+    def unpack_batch(self, batch: Dict) -> Dict[str, Dict]:
+        """Split a generate_signals_batch result into generate_signal-style dicts per symbol"""
+        signals = {}
+        for i, symbol in enumerate(batch["symbols"]):
+            if not batch["indicators"]:
+                signals[symbol] = self._insufficient_data()
+                continue
+            
+            values = {name: float(column[i]) for name, column in batch["indicators"].items()}
+            signals[symbol] = {
+                "signal_type": str(batch["signal_type"][i]),
+                "confidence": float(batch["confidence"][i]),
+                "indicators": {
+                    "rsi": values["rsi"],
+                    "macd": {
+                        "macd": values["macd"],
+                        "signal": values["macd_signal"],
+                        "histogram": values["macd_histogram"]
+                    },
+                    "moving_averages": {
+                        "sma20": values["sma20"],
+                        "sma50": values["sma50"],
+                        "ema12": values["ema12"]
+                    },
+                    "current_price": float(batch["current_price"][i])
+                },
+                "is_valid": bool(batch["is_valid"][i])
+            }
+        return signals
+    
+    def evaluate_arrays(self, values: Dict[str, np.ndarray], current_price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized version of _evaluate: returns signal types and confidences elementwise"""
+        rsi = values["rsi"]
+        rsi_buy = rsi < self.rsi_oversold
+        rsi_sell = rsi > self.rsi_overbought
+        
+        macd_buy = (values["macd_histogram"] > 0) & (values["macd"] > values["macd_signal"])
+        macd_sell = (values["macd_histogram"] < 0) & (values["macd"] < values["macd_signal"])
+        
+        sma20, sma50 = values["sma20"], values["sma50"]
+        ma_buy = (current_price > sma20) & (sma20 > sma50)
+        ma_sell = (current_price < sma20) & (sma20 < sma50)
+        
+        confidence = (50.0 + 10.0 * (rsi_buy | rsi_sell) + 5.0 * (macd_buy | macd_sell)
+                      + 5.0 * (ma_buy | ma_sell))
+        confidence = np.minimum(confidence, 100.0)
+        
+        buy_signals = rsi_buy.astype(np.int8) + macd_buy + ma_buy
+        sell_signals = rsi_sell.astype(np.int8) + macd_sell + ma_sell
+        signal_type = np.select(
+            [buy_signals > sell_signals, sell_signals > buy_signals],
+            ["BUY", "SELL"],
+            default="HOLD"
+        )
+        return signal_type, confidence
+    
+    def get_stream(self, symbol: str, timeframe: int) -> ta.IncrementalIndicators:
+        """Get (or create) the streaming indicator state for a symbol/timeframe"""
+        by_timeframe = self.streams.setdefault(symbol, {})
+        stream = by_timeframe.get(timeframe)
+        if stream is None:
+            stream = by_timeframe[timeframe] = ta.IncrementalIndicators(**self.indicator_params())
+        return stream
+    
+    def seed_stream(self, symbol: str, timeframe: int, candle_data: Candles) -> ta.IncrementalIndicators:
+        """Seed the streaming state for a symbol/timeframe from closed candles"""
+        return self.get_stream(symbol, timeframe).seed(self._closes(candle_data))
+    
+    def update_stream(self, symbol: str, timeframe: int, close: float) -> Dict:
+        """Add a closed bar to the streaming state and generate a signal in O(1)"""
+        values = self.get_stream(symbol, timeframe).update(close)
+        signal = self._stream_signal(values, close)
+        self.latest_signals[(symbol, timeframe)] = signal
+        return signal
+    
+    def generate_stream_signal(self, symbol: str, timeframe: int, current_price: float) -> Dict:
+        """Generate a signal for the forming bar at current_price without changing the state"""
+        stream = self.streams.get(symbol, {}).get(timeframe)
+        if stream is None:
+            return self._insufficient_data()
         
+        signal = self._stream_signal(stream.preview(current_price), current_price)
+        self.latest_signals[(symbol, timeframe)] = signal
+        return signal
+    
+    async def on_bar_closed(self, bar: Dict) -> Dict:
+        """Commit a closed bar (a TickAggregator event) to its stream, see SignalHub.on_bar_closed"""
+        return self.update_stream(bar["symbol"], bar["timeframe"], bar["close"])
+    
+    def _stream_signal(self, values: Dict, current_price: float) -> Dict:
+        if values["bars"] < self.min_bars:
+            return self._insufficient_data()
+        
+        return self._evaluate(values["rsi"], values["macd"], values["moving_averages"], current_price)
+    
+    def _closes(self, candle_data: Candles) -> np.ndarray:
+        """Close prices as a float64 array (a view when given columnar candles)"""
+        if isinstance(candle_data, (CandleBuffer, CandleView)):
+            return candle_data.close
+        
+        return np.fromiter((c["close"] for c in candle_data), dtype=np.float64, count=len(candle_data))
+    
+    def _insufficient_data(self) -> Dict:
+        return {
+            "signal_type": "HOLD",
+            "confidence": 0,
+            "indicators": {},
+            "reason": "Insufficient data"
+        }
+    
+    def _evaluate(self, rsi: float, macd: Dict[str, float], mas: Dict[str, float],
+                  current_price: float) -> Dict:
+        """Apply the signal rules to the latest indicator values"""
         indicators = {
             "rsi": rsi,
             "macd": macd,
@@ -100,10 +261,10 @@ class SignalGenerator:
         signals = []
         
         # RSI signals
-        if rsi < 30:
+        if rsi < self.rsi_oversold:
             signals.append(("BUY", 20))
             confidence += 10
-        elif rsi > 70:
+        elif rsi > self.rsi_overbought:
             signals.append(("SELL", 20))
             confidence += 10
         
@@ -145,10 +306,16 @@ class SignalGenerator:
         }
     
     def calculate_position_size(self, account_balance: float, risk_percent: float,
-                              entry_price: float, stop_loss_pips: float) -> float:
-        """Calculate position size based on risk management"""
+                              entry_price: float, stop_loss_pips: float,
+                              spec: Optional[Dict[str, float]] = None) -> float:
+        """Calculate position size (in units) based on risk management
+        
+        ``spec`` is the symbol's contract spec (see SymbolSpecs.get); without
+        it XAUUSD's pip value is assumed.
+        """
         risk_amount = account_balance * (risk_percent / 100)
-        pip_value = 0.01  # For XAUUSD
+        # Per unit
+        pip_value = spec["pip_value"] / spec["contract_size"] if spec else 0.01
         stop_loss_amount = stop_loss_pips * pip_value
         
         if stop_loss_amount == 0:
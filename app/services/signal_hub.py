@@ -0,0 +1,247 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import SignalSubscription
+from app.services.candles import candles_before, to_epoch
+from app.services.live_feed import LiveFeed, get_live_feed
+from app.services.mt5_connector import get_mt5_connector
+from app.services.signal_scanner import SignalScanner, get_signal_scanner
+from app.services.signal_writer import SignalWriter, get_signal_writer
+from app.services.tick_aggregator import TickAggregator, get_tick_aggregator
+
+logger = logging.getLogger(__name__)
+
+# (symbol, timeframe, bar_time)
+SignalKey = Tuple[str, int, datetime]
+
+
+class SignalHub:
+    """Computes each symbol/timeframe/bar signal once and fans it out to subscribed users
+
+    Indicators and rules run once per symbol for all users (one batched scan per
+    timeframe); the per-user confidence thresholds are then applied with a
+    single vectorized comparison. Results are cached per bar so repeated or
+    overlapping requests for the same bar reuse them. The tick aggregator
+    follows the subscribed symbols, and its bar closes trigger their signals
+    as soon as a bar ends (see ``on_bar_closed``), from the generator's
+    streaming indicator state in O(1) per bar instead of a full window scan.
+    """
+
+    def __init__(self, connector, scanner: SignalScanner, writer: SignalWriter, feed: LiveFeed,
+                 aggregator: Optional[TickAggregator] = None, history_bars: int = 100,
+                 cache_size: int = 4096):
+        self.connector = connector
+        self.aggregator = aggregator
+        self.scanner = scanner
+        self.writer = writer
+        self.feed = feed
+        self.history_bars = history_bars
+        self.cache_size = cache_size
+        # (symbol, timeframe) -> user id -> confidence threshold
+        self._subscriptions: Dict[Tuple[str, int], Dict[int, float]] = {}
+        # (symbol, timeframe) -> (user ids, thresholds), rebuilt after subscription changes
+        self._recipients: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._signals: "OrderedDict[SignalKey, Dict]" = OrderedDict()
+        self._fanned_out: set = set()
+        # (symbol, timeframe) -> open time of the last bar in the generator's stream
+        self._stream_bars: Dict[Tuple[str, int], int] = {}
+        self.computed = 0
+        self.cache_hits = 0
+        self.streamed = 0
+        self.seeded = 0
+        self.delivered = 0
+
+    # ----- subscriptions -----
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(select(SignalSubscription))
+        subscriptions = result.scalars().all()
+        self._subscriptions = {}
+        self._recipients = {}
+        for subscription in subscriptions:
+            self.subscribe(subscription.user_id, subscription.symbol, subscription.timeframe,
+                           subscription.confidence_threshold)
+        self._refresh_symbols()
+        logger.info(f"Signal hub loaded {len(subscriptions)} subscriptions")
+
+    def subscribe(self, user_id: int, symbol: str, timeframe: int, confidence_threshold: float):
+        self._subscriptions.setdefault((symbol, timeframe), {})[user_id] = confidence_threshold
+        self._recipients.pop((symbol, timeframe), None)
+        self._refresh_symbols()
+
+    def unsubscribe(self, user_id: int, symbol: str, timeframe: int):
+        users = self._subscriptions.get((symbol, timeframe), {})
+        users.pop(user_id, None)
+        if not users:
+            self._subscriptions.pop((symbol, timeframe), None)
+            self._stream_bars.pop((symbol, timeframe), None)
+            self.scanner.generator.streams.get(symbol, {}).pop(timeframe, None)
+        self._recipients.pop((symbol, timeframe), None)
+        self._refresh_symbols()
+
+    def _refresh_symbols(self):
+        if self.aggregator is not None:
+            self.aggregator.set_symbols(symbol for symbol, _ in self._subscriptions)
+
+    def symbols(self, timeframe: int) -> List[str]:
+        """Symbols with at least one subscriber on ``timeframe``"""
+        return [symbol for symbol, tf in self._subscriptions if tf == timeframe]
+
+    @property
+    def timeframes(self) -> List[int]:
+        return sorted({tf for _, tf in self._subscriptions})
+
+    def _get_recipients(self, symbol: str, timeframe: int) -> Tuple[np.ndarray, np.ndarray]:
+        recipients = self._recipients.get((symbol, timeframe))
+        if recipients is None:
+            users = self._subscriptions.get((symbol, timeframe), {})
+            recipients = (
+                np.fromiter(users.keys(), dtype=np.int64, count=len(users)),
+                np.fromiter(users.values(), dtype=np.float64, count=len(users)),
+            )
+            self._recipients[(symbol, timeframe)] = recipients
+        return recipients
+
+    # ----- computation -----
+
+    def get_signal(self, symbol: str, timeframe: int, bar_time: datetime) -> Optional[Dict]:
+        return self._signals.get((symbol, timeframe, bar_time))
+
+    def _cache(self, key: SignalKey, signal: Dict):
+        self._signals[key] = signal
+        while len(self._signals) > self.cache_size:
+            evicted, _ = self._signals.popitem(last=False)
+            self._fanned_out.discard(evicted)
+
+    async def compute(self, timeframe: int, bar_time: datetime,
+                      symbols: Iterable[str] = None) -> Dict[str, Dict]:
+        """Signals of ``symbols`` (default: all subscribed) from the closed bars up to ``bar_time``"""
+        symbols = list(symbols) if symbols is not None else self.symbols(timeframe)
+        signals = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._signals.get((symbol, timeframe, bar_time))
+            if cached is not None:
+                self.cache_hits += 1
+                signals[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        if missing:
+            # Only bars that closed by bar_time: neither the one forming now nor any later one
+            end = to_epoch(bar_time)
+            candles = {
+                symbol: candles_before(
+                    await self.connector.get_candle_data(symbol, timeframe, self.history_bars, include_forming=False),
+                    end,
+                )
+                for symbol in missing
+            }
+            batch = await self.scanner.scan_candles(candles)
+            for symbol, signal in self.scanner.generator.unpack_batch(batch).items():
+                self._cache((symbol, timeframe, bar_time), signal)
+                signals[symbol] = signal
+            self.computed += len(missing)
+        return signals
+
+    def fan_out(self, symbol: str, timeframe: int, bar_time: datetime, signal: Dict) -> int:
+        """Store the signal for every subscriber and push it to those whose threshold it meets
+
+        HOLD and insufficient-data results are not distributed. Each bar is
+        fanned out at most once; returns the number of users it was stored for.
+        """
+        key = (symbol, timeframe, bar_time)
+        if key in self._fanned_out or signal["signal_type"] == "HOLD" or not signal["indicators"]:
+            return 0
+        self._fanned_out.add(key)
+
+        user_ids, thresholds = self._get_recipients(symbol, timeframe)
+        if not len(user_ids):
+            return 0
+
+        valid = signal["confidence"] >= thresholds
+        self.writer.submit(symbol, timeframe, bar_time, signal, zip(user_ids.tolist(), valid.tolist()))
+
+        payload = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "bar_time": bar_time.isoformat(),
+            "signal_type": signal["signal_type"],
+            "confidence": signal["confidence"],
+            "entry_price": signal["indicators"]["current_price"],
+            "indicators": signal["indicators"],
+            "is_valid": True,
+        }
+        for user_id in user_ids[valid].tolist():
+            if self.feed.is_connected(user_id):
+                self.feed.publish_signal(user_id, payload)
+                self.delivered += 1
+        return len(user_ids)
+
+    async def on_bar_closed(self, bar: Dict) -> int:
+        """Bar-closed listener (see TickAggregator.add_listener): signal a subscribed bar right away
+
+        The bar is keyed by its close time, as the scheduler's run for the same
+        bar is, which then finds it cached and already fanned out.
+        """
+        symbol, timeframe = bar["symbol"], bar["timeframe"]
+        if (symbol, timeframe) not in self._subscriptions:
+            return 0
+        bar_time = datetime.utcfromtimestamp(bar["time"] + timeframe * 60)
+        # The stream is advanced even when the bar is already cached, so it stays current
+        signal = await self._update_stream(bar)
+        key = (symbol, timeframe, bar_time)
+        if key in self._signals:
+            self.cache_hits += 1
+        else:
+            self._cache(key, signal)
+            self.computed += 1
+        return self.fan_out(symbol, timeframe, bar_time, self._signals[key])
+
+    async def _update_stream(self, bar: Dict) -> Dict:
+        """Add a closed bar to the generator's stream, (re)seeding it first unless it ends with the previous bar"""
+        symbol, timeframe = bar["symbol"], bar["timeframe"]
+        generator = self.scanner.generator
+        if self._stream_bars.get((symbol, timeframe)) != bar["time"] - timeframe * 60:
+            # First bar, or bars were missed: seed from the closed history before this bar
+            history = await self.connector.get_candle_data(symbol, timeframe, self.history_bars,
+                                                           include_forming=False)
+            generator.seed_stream(symbol, timeframe, candles_before(history, bar["time"]))
+            self.seeded += 1
+        else:
+            self.streamed += 1
+        self._stream_bars[(symbol, timeframe)] = bar["time"]
+        return await generator.on_bar_closed(bar)
+
+    async def run(self, timeframe: int, bar_time: datetime) -> Dict:
+        """Compute and distribute every subscribed signal of one timeframe's closed bar"""
+        signals = await self.compute(timeframe, bar_time)
+        recipients = sum(
+            self.fan_out(symbol, timeframe, bar_time, signal) for symbol, signal in signals.items()
+        )
+        return {"symbols": len(signals), "recipients": recipients}
+
+    def metrics(self) -> Dict:
+        return {
+            "subscriptions": sum(len(users) for users in self._subscriptions.values()),
+            "streams": len(self._subscriptions),
+            "cached_signals": len(self._signals),
+            "computed": self.computed,
+            "cache_hits": self.cache_hits,
+            "streamed": self.streamed,
+            "seeded": self.seeded,
+            "delivered": self.delivered,
+        }
+
+
+@lru_cache()
+def get_signal_hub() -> SignalHub:
+    return SignalHub(get_mt5_connector(), get_signal_scanner(), get_signal_writer(), get_live_feed(),
+                     aggregator=get_tick_aggregator())
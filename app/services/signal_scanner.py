@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.candles import CandleBuffer
+from app.services.signal_generator import SignalGenerator
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("inline", "process")
+
+
+def _scan_chunk(shm_name: str, shape: tuple, start: int, stop: int,
+                current_prices: np.ndarray, config: Dict) -> Dict:
+    """Worker entry point: run the batch rules on rows [start, stop) of the shared close array"""
+    # Workers share the parent's resource tracker, so the parent's unlink() cleans up for everyone
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        closes = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:stop]
+        return SignalGenerator(**config).generate_signals_batch(closes, current_prices)
+    finally:
+        shm.close()
+
+
+class SignalScanner:
+    """Runs multi-symbol signal scans inline or on a process pool"""
+
+    def __init__(self, generator: SignalGenerator = None, mode: str = "inline",
+                 workers: Optional[int] = None):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown signal execution mode: {mode}")
+
+        self.generator = generator or SignalGenerator()
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def scan(self, symbols: List[str], closes: np.ndarray,
+                   current_prices: np.ndarray = None) -> Dict:
+        """Scan a (symbols x bars) close array; returns a generate_signals_batch result"""
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        if current_prices is None:
+            current_prices = closes[:, -1] if closes.shape[1] else np.zeros(len(symbols))
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+
+        if self.mode == "inline" or len(symbols) < 2 or closes.shape[1] < self.generator.min_bars:
+            return self.generator.generate_signals_batch(closes, current_prices, symbols)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        shm = shared_memory.SharedMemory(create=True, size=max(closes.nbytes, 1))
+        try:
+            shared = np.ndarray(closes.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = closes
+            del shared
+
+            bounds = np.linspace(0, len(symbols), min(self.workers, len(symbols)) + 1).astype(int)
+            config = self.generator.get_params()
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _scan_chunk, shm.name, closes.shape, start, stop,
+                    current_prices[start:stop], config
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return self._merge(symbols, chunks, current_prices)
+
+    async def scan_candles(self, candles: Dict[str, CandleBuffer],
+                           current_prices: Dict[str, float] = None) -> Dict:
+        """Scan several candle buffers, aligned on their most recent common number of bars"""
+        symbols = list(candles)
+        bars = min((len(buffer) for buffer in candles.values()), default=0)
+        closes = np.empty((len(symbols), bars))
+        for row, symbol in enumerate(symbols):
+            closes[row] = candles[symbol].close[len(candles[symbol]) - bars:]
+
+        prices = None
+        if current_prices is not None:
+            prices = np.array([current_prices.get(symbol, closes[row, -1]) for row, symbol in enumerate(symbols)])
+        return await self.scan(symbols, closes, prices)
+
+    def _merge(self, symbols: List[str], chunks: List[Dict], current_prices: np.ndarray) -> Dict:
+        return {
+            "symbols": list(symbols),
+            "signal_type": np.concatenate([chunk["signal_type"] for chunk in chunks]),
+            "confidence": np.concatenate([chunk["confidence"] for chunk in chunks]),
+            "is_valid": np.concatenate([chunk["is_valid"] for chunk in chunks]),
+            "indicators": {
+                name: np.concatenate([chunk["indicators"][name] for chunk in chunks])
+                for name in chunks[0]["indicators"]
+            },
+            "current_price": current_prices
+        }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+@lru_cache()
+def get_signal_scanner() -> SignalScanner:
+    settings = get_settings()
+    return SignalScanner(
+        SignalGenerator(confidence_threshold=settings.SIGNAL_CONFIDENCE_THRESHOLD),
+        mode=settings.SIGNAL_EXECUTION_MODE,
+        workers=settings.SIGNAL_WORKERS or None,
+    )
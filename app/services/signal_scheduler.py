@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import get_settings
+from app.services.signal_hub import SignalHub, get_signal_hub
+
+logger = logging.getLogger(__name__)
+
+
+class SignalScheduler:
+    """Runs the signal hub at every bar close of each timeframe
+
+    Wakes at the next close of any configured or subscribed timeframe (plus
+    ``delay`` seconds for the broker to finalise the bar) and starts one run per
+    timeframe closing then. A timeframe whose previous run is still going
+    skips that bar, and at most ``concurrency`` runs execute at once. Run
+    duration and lateness (start minus bar close) are tracked per timeframe.
+    """
+
+    def __init__(self, hub: SignalHub, timeframes: Iterable[int] = (), concurrency: int = 2,
+                 delay: float = 0.5):
+        self.hub = hub
+        self.configured = {int(tf) for tf in timeframes if int(tf) > 0}
+        self.delay = delay
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._running: Dict[int, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[int, Dict] = {}
+
+    @property
+    def timeframes(self) -> List[int]:
+        """Configured timeframes plus any users subscribed to, in minutes"""
+        return sorted(self.configured | {tf for tf in self.hub.timeframes if tf > 0})
+
+    @staticmethod
+    def next_close(timeframe: int, now: float) -> float:
+        """Epoch seconds of the first bar close of ``timeframe`` after ``now``"""
+        period = timeframe * 60
+        return (int(now // period) + 1) * period
+
+    def _stat(self, timeframe: int) -> Dict:
+        return self._stats.setdefault(timeframe, {
+            "runs": 0, "skipped": 0, "failed": 0,
+            "last_duration": 0.0, "max_duration": 0.0,
+            "last_lateness": 0.0, "max_lateness": 0.0,
+        })
+
+    def trigger(self, timeframe: int, close: float) -> bool:
+        """Start the run of the bar closing at ``close``; False when the previous one is still going"""
+        running = self._running.get(timeframe)
+        if running is not None and not running.done():
+            self._stat(timeframe)["skipped"] += 1
+            logger.warning(f"Signal run for M{timeframe} still in progress, skipping bar {close:.0f}")
+            return False
+        self._running[timeframe] = asyncio.create_task(self._run(timeframe, close))
+        return True
+
+    async def _run(self, timeframe: int, close: float):
+        stat = self._stat(timeframe)
+        async with self._semaphore:
+            started = time.time()
+            lateness = started - close
+            stat["last_lateness"] = lateness
+            stat["max_lateness"] = max(stat["max_lateness"], lateness)
+            try:
+                result = await self.hub.run(timeframe, datetime.utcfromtimestamp(close))
+            except Exception as e:
+                stat["failed"] += 1
+                logger.error(f"Signal run for M{timeframe} failed: {e}")
+                return
+            finally:
+                duration = time.time() - started
+                stat["last_duration"] = duration
+                stat["max_duration"] = max(stat["max_duration"], duration)
+        stat["runs"] += 1
+        logger.info(
+            f"M{timeframe} signals: {result['symbols']} symbols, {result['recipients']} recipients "
+            f"in {duration * 1000:.0f} ms, {lateness * 1000:.0f} ms after close"
+        )
+
+    async def _loop(self):
+        while True:
+            timeframes = self.timeframes
+            if not timeframes:
+                await asyncio.sleep(60)
+                continue
+            now = time.time()
+            closes = {tf: self.next_close(tf, now) for tf in timeframes}
+            close = min(closes.values())
+            await asyncio.sleep(max(0.0, close + self.delay - time.time()))
+            for timeframe, tf_close in closes.items():
+                if tf_close == close:
+                    self.trigger(timeframe, close)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"Signal scheduler started for timeframes {self.timeframes}")
+
+    async def stop(self):
+        """Stop scheduling and let runs in progress finish"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+        self._running = {}
+
+    def metrics(self) -> Dict:
+        return {
+            "timeframes": self.timeframes,
+            "running": sorted(tf for tf, task in self._running.items() if not task.done()),
+            "by_timeframe": {tf: dict(stat) for tf, stat in sorted(self._stats.items())},
+        }
+
+
+@lru_cache()
+def get_signal_scheduler() -> SignalScheduler:
+    settings = get_settings()
+    extra = [tf for tf in settings.SIGNAL_TIMEFRAMES.split(",") if tf.strip()]
+    return SignalScheduler(
+        get_signal_hub(),
+        timeframes=[settings.TARGET_TIMEFRAME, *extra],
+        concurrency=settings.SIGNAL_SCHEDULER_CONCURRENCY,
+        delay=settings.SIGNAL_SCHEDULER_DELAY,
+    )
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, dialect_insert
+from app.models.database import Signal, SignalSnapshot, SignalType
+
+logger = logging.getLogger(__name__)
+
+# (symbol, timeframe, bar_time)
+SnapshotKey = Tuple[str, int, datetime]
+
+
+class SignalWriter:
+    """Buffers generated signals and writes them in bulk
+
+    The indicator payload of a signal is stored once per symbol/timeframe/bar
+    in ``signal_snapshots``; each user only gets a narrow ``signals`` row that
+    points at it. Buffers are written with one multi-row INSERT per table when
+    ``batch_size`` user rows are pending or every ``flush_interval`` seconds.
+    A batch that fails ``max_retries`` writes in a row is dropped.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, batch_size: int = 1000,
+                 flush_interval: float = 1.0, max_pending: int = 100000, max_retries: int = 3):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._snapshots: Dict[SnapshotKey, Dict] = {}
+        self._rows: Dict[SnapshotKey, List[Dict]] = {}
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failures = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.snapshots_written = 0
+        self.dropped = 0
+
+    def submit(self, symbol: str, timeframe: int, bar_time: datetime, signal: Dict,
+               recipients: Iterable[Tuple[int, bool]]) -> int:
+        """Queue one generated signal for ``recipients`` as ``(user_id, is_valid)``; returns rows queued"""
+        if bar_time.tzinfo is not None:
+            # Snapshot ids are matched back by key, so it must round-trip the naive UTC column
+            bar_time = bar_time.astimezone(timezone.utc).replace(tzinfo=None)
+        recipients = list(recipients)
+        if self._pending + len(recipients) > self.max_pending:
+            # The database is not keeping up; shed the newest rows instead of growing without bound
+            self.dropped += len(recipients)
+            logger.warning(f"Signal writer buffer full, dropped {len(recipients)} signals for {symbol}")
+            return 0
+
+        key = (symbol, timeframe, bar_time)
+        if key not in self._snapshots:
+            self._snapshots[key] = {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "bar_time": bar_time,
+                "signal_type": SignalType[signal["signal_type"]],
+                "confidence": signal["confidence"],
+                "current_price": signal.get("indicators", {}).get("current_price"),
+                "indicators_data": json.dumps(signal.get("indicators", {}), default=float),
+                "created_at": datetime.utcnow(),
+            }
+            self._rows[key] = []
+
+        snapshot = self._snapshots[key]
+        rows = [
+            {
+                "user_id": user_id,
+                "symbol": symbol,
+                "signal_type": snapshot["signal_type"],
+                "confidence": signal["confidence"],
+                "entry_price": snapshot["current_price"],
+                "is_valid": is_valid,
+                "created_at": snapshot["created_at"],
+            }
+            for user_id, is_valid in recipients
+        ]
+        self._rows[key].extend(rows)
+        self._pending += len(rows)
+        if self._pending >= self.batch_size:
+            self._wake.set()
+        return len(rows)
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of signal rows written"""
+        if not self._snapshots:
+            return 0
+
+        snapshots, self._snapshots = self._snapshots, {}
+        rows, self._rows = self._rows, {}
+        pending, self._pending = self._pending, 0
+
+        snapshot_table = SignalSnapshot.__table__
+        try:
+            async with self.session_factory() as db:
+                statement = dialect_insert(db, snapshot_table).values(list(snapshots.values()))
+                # Re-generated bars (e.g. after a restart) keep their id and take the newest payload
+                statement = statement.on_conflict_do_update(
+                    index_elements=[snapshot_table.c.symbol, snapshot_table.c.timeframe, snapshot_table.c.bar_time],
+                    set_={
+                        "signal_type": statement.excluded.signal_type,
+                        "confidence": statement.excluded.confidence,
+                        "current_price": statement.excluded.current_price,
+                        "indicators_data": statement.excluded.indicators_data,
+                    },
+                ).returning(
+                    snapshot_table.c.id, snapshot_table.c.symbol,
+                    snapshot_table.c.timeframe, snapshot_table.c.bar_time,
+                )
+                result = await db.execute(statement)
+                snapshot_ids = {(symbol, timeframe, bar_time): id_ for id_, symbol, timeframe, bar_time in result}
+
+                signal_rows = [
+                    {**row, "snapshot_id": snapshot_ids[key]}
+                    for key, key_rows in rows.items() for row in key_rows
+                ]
+                if signal_rows:
+                    await db.execute(insert(Signal.__table__), signal_rows)
+                await db.commit()
+        except Exception as e:
+            self._failures += 1
+            if self._failures >= self.max_retries:
+                self._failures = 0
+                self.dropped += pending
+                logger.error(f"Signal write failed {self.max_retries} times, dropped {pending} signals: {e}")
+                return 0
+            # Keep the batch (merged ahead of anything queued meanwhile) for the next attempt
+            for key, snapshot in snapshots.items():
+                self._snapshots.setdefault(key, snapshot)
+                self._rows[key] = rows[key] + self._rows.get(key, [])
+            self._pending += pending
+            logger.error(f"Signal write failed: {e}")
+            return 0
+
+        self._failures = 0
+        self.flushes += 1
+        self.snapshots_written += len(snapshots)
+        self.rows_written += len(signal_rows)
+        return len(signal_rows)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def stop(self):
+        """Stop the flush loop and write what is still buffered"""
+        if self._task is not None:
+            # Let an in-flight write finish rather than cancelling it halfway
+            self._stopping = True
+            self._wake.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> Dict:
+        return {
+            "pending_rows": self._pending,
+            "pending_snapshots": len(self._snapshots),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "snapshots_written": self.snapshots_written,
+            "dropped": self.dropped,
+        }
+
+
+@lru_cache()
+def get_signal_writer() -> SignalWriter:
+    settings = get_settings()
+    return SignalWriter(
+        batch_size=settings.SIGNAL_WRITE_BATCH_SIZE,
+        flush_interval=settings.SIGNAL_WRITE_INTERVAL,
+    )
@@ -0,0 +1,129 @@
+import logging
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import SymbolSpec
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("contract_size", "pip_size", "pip_value", "min_lot", "max_lot", "lot_step", "margin_rate")
+
+# Seeded into symbol_specs when the table is empty (USD account, 1:100 leverage)
+DEFAULT_SPECS: Dict[str, Dict[str, float]] = {
+    "XAUUSD": {"contract_size": 100, "pip_size": 0.01, "pip_value": 1.0,
+               "min_lot": 0.01, "max_lot": 200, "lot_step": 0.01, "margin_rate": 0.01},
+    "XAGUSD": {"contract_size": 5000, "pip_size": 0.001, "pip_value": 5.0,
+               "min_lot": 0.01, "max_lot": 200, "lot_step": 0.01, "margin_rate": 0.01},
+    "EURUSD": {"contract_size": 100000, "pip_size": 0.0001, "pip_value": 10.0,
+               "min_lot": 0.01, "max_lot": 200, "lot_step": 0.01, "margin_rate": 0.01},
+    "GBPUSD": {"contract_size": 100000, "pip_size": 0.0001, "pip_value": 10.0,
+               "min_lot": 0.01, "max_lot": 200, "lot_step": 0.01, "margin_rate": 0.01},
+}
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class UnknownSymbolError(ValueError):
+    """Raised for a symbol without a contract spec"""
+
+
+class SymbolSpecs:
+    """Contract specs of every symbol, held as columns for vectorized sizing"""
+
+    def __init__(self, specs: Dict[str, Dict[str, float]] = None):
+        self._set(specs or DEFAULT_SPECS)
+
+    def _set(self, specs: Dict[str, Dict[str, float]]):
+        self.symbols = list(specs)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._columns = {
+            field: np.array([float(specs[symbol][field]) for symbol in self.symbols]) for field in FIELDS
+        }
+
+    async def load(self, db: AsyncSession):
+        """Read the spec table once (seeding it with the defaults when empty)"""
+        result = await db.execute(select(SymbolSpec))
+        rows = result.scalars().all()
+        if not rows:
+            db.add_all(SymbolSpec(symbol=symbol, **spec) for symbol, spec in DEFAULT_SPECS.items())
+            await db.commit()
+            self._set(DEFAULT_SPECS)
+        else:
+            self._set({row.symbol: {field: getattr(row, field) for field in FIELDS} for row in rows})
+        logger.info(f"Loaded contract specs for {len(self.symbols)} symbols")
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def _position(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is None:
+            raise UnknownSymbolError(f"No contract spec for symbol {symbol}")
+        return i
+
+    def get(self, symbol: str) -> Dict[str, float]:
+        i = self._position(symbol)
+        return {field: float(column[i]) for field, column in self._columns.items()}
+
+    def units(self, symbol: str, volume: float) -> float:
+        """Contract units of ``volume`` lots, the quantity P&L is booked on
+
+        Symbols without a spec (trades opened before specs existed) count one
+        unit per lot.
+        """
+        i = self._index.get(symbol)
+        return volume * float(self._columns["contract_size"][i]) if i is not None else volume
+
+    def _indices(self, symbols: Union[str, Sequence[str]]) -> np.ndarray:
+        if isinstance(symbols, str):
+            return np.array(self._position(symbols))
+        return np.array([self._position(symbol) for symbol in symbols])
+
+    def size_positions(self, symbols: Union[str, Sequence[str]], balance: ArrayLike,
+                       risk_percent: ArrayLike, stop_loss_pips: ArrayLike, entry_price: ArrayLike,
+                       free_margin: Optional[ArrayLike] = None) -> Dict[str, np.ndarray]:
+        """Lot sizes and required margin for many orders in one call
+
+        Every argument is a scalar or an array broadcast against the others, so
+        one signal can be sized for thousands of accounts (or many signals for
+        one account). Lots risk at most ``risk_percent`` of ``balance`` on the
+        stop loss, are rounded down to the lot step, capped at the max lot and,
+        when given, at what ``free_margin`` can carry. Orders that cannot afford
+        the minimum lot get 0.
+        """
+        i = self._indices(symbols)
+        spec = {field: column[i] for field, column in self._columns.items()}
+        balance = np.asarray(balance, dtype=np.float64)
+        entry_price = np.asarray(entry_price, dtype=np.float64)
+        risk_per_lot = np.asarray(stop_loss_pips, dtype=np.float64) * spec["pip_value"]
+        margin_per_lot = spec["contract_size"] * entry_price * spec["margin_rate"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lots = np.where(
+                risk_per_lot > 0,
+                balance * np.asarray(risk_percent, dtype=np.float64) / 100 / risk_per_lot,
+                spec["min_lot"],
+            )
+            if free_margin is not None:
+                lots = np.minimum(lots, np.asarray(free_margin, dtype=np.float64) / margin_per_lot)
+
+        # Round down to the lot step (the epsilon absorbs float error like 0.3 / 0.01 = 29.999...)
+        lots = np.floor(lots / spec["lot_step"] + 1e-9) * spec["lot_step"]
+        lots = np.minimum(lots, spec["max_lot"])
+        lots = np.where(lots >= spec["min_lot"] - 1e-12, np.round(lots, 8), 0.0)
+
+        return {
+            "lots": lots,
+            "units": lots * spec["contract_size"],
+            "margin": lots * margin_per_lot,
+            "risk": lots * risk_per_lot,
+        }
+
+
+@lru_cache()
+def get_symbol_specs() -> SymbolSpecs:
+    return SymbolSpecs()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.candles import CandleBuffer, to_epoch
+
+logger = logging.getLogger(__name__)
+
+BarListener = Callable[[Dict], Awaitable[None]]
+
+
+class TickAggregator:
+    """Builds OHLCV bars for several timeframes at once from a bid/ask tick stream
+
+    Bars use the bid price (as MT5 candles do) and count ticks as volume. A bar
+    is closed, stored in a bounded CandleBuffer and published to the bar-closed
+    listeners as soon as the first tick of the next bar arrives, or when
+    ``close_expired`` is called after the bar's end time. Once started, it
+    consumes the connector's ticks for ``symbols`` and sweeps expired bars
+    ``delay`` seconds after every bar boundary of its shortest timeframe.
+    """
+
+    DEFAULT_TIMEFRAMES = (1, 5, 15, 60)
+
+    def __init__(self, timeframes: Optional[Iterable[int]] = None, capacity: int = 500,
+                 delay: float = 0.1):
+        if timeframes is None:
+            timeframes = set(self.DEFAULT_TIMEFRAMES) | {get_settings().TARGET_TIMEFRAME}
+        self.timeframes = sorted(timeframes)
+        self.capacity = capacity
+        self.delay = delay
+        self.listeners: List[BarListener] = []
+        self.symbols: set = set()
+        self._ticks = None
+        self._tasks: List[asyncio.Task] = []
+        # (symbol, timeframe) -> [open_time, open, high, low, close, tick_count]
+        self._forming: Dict[Tuple[str, int], list] = {}
+        self._candles: Dict[Tuple[str, int], CandleBuffer] = {}
+
+    def add_listener(self, listener: BarListener):
+        """Register an async callback receiving each closed bar as a dict"""
+        self.listeners.append(listener)
+
+    def candles(self, symbol: str, timeframe: int) -> CandleBuffer:
+        """Closed bars kept in memory for a symbol/timeframe (at most ``capacity``)"""
+        key = (symbol, timeframe)
+        buffer = self._candles.get(key)
+        if buffer is None:
+            buffer = self._candles[key] = CandleBuffer(self.capacity)
+        return buffer
+
+    def forming_bar(self, symbol: str, timeframe: int) -> Optional[Dict]:
+        """The bar currently being built, if any"""
+        bar = self._forming.get((symbol, timeframe))
+        return self._as_dict(symbol, timeframe, bar) if bar else None
+
+    def seed(self, symbol: str, timeframe: int, candles):
+        """Preload closed bars (e.g. from MT5Connector.get_candle_data(..., include_forming=False))"""
+        self.candles(symbol, timeframe).extend(
+            candles.time, candles.open, candles.high, candles.low, candles.close, candles.volume
+        )
+
+    async def on_tick(self, tick: Dict):
+        """Tick callback (see MT5Connector.subscribe_to_ticks)"""
+        symbol = tick["symbol"]
+        price = float(tick["bid"])
+        timestamp = to_epoch(tick["timestamp"])
+
+        # Bars are closed and replaced before any listener is awaited, so a tick
+        # or expiry sweep running meanwhile never sees (or closes) them again
+        closed = []
+        for timeframe in self.timeframes:
+            step = timeframe * 60
+            open_time = timestamp // step * step
+            key = (symbol, timeframe)
+            bar = self._forming.get(key)
+
+            if bar is not None and open_time > bar[0]:
+                closed.append(self._close(key, bar))
+                bar = None
+            elif bar is not None and open_time < bar[0]:
+                # Late tick for a bar that is already closed
+                continue
+
+            if bar is None:
+                self._forming[key] = [open_time, price, price, price, price, 1]
+            else:
+                if price > bar[2]:
+                    bar[2] = price
+                if price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[5] += 1
+
+        await self._publish(closed)
+
+    async def close_expired(self, now) -> int:
+        """Close every forming bar whose period ended before ``now``; returns how many were closed"""
+        now = to_epoch(now)
+        closed = [
+            self._close(key, bar) for key, bar in list(self._forming.items())
+            if bar[0] + key[1] * 60 <= now
+        ]
+        await self._publish(closed)
+        return len(closed)
+
+    def _close(self, key: Tuple[str, int], bar: list) -> Dict:
+        del self._forming[key]
+        self.candles(*key).append(*bar)
+        return self._as_dict(key[0], key[1], bar)
+
+    async def _publish(self, events: List[Dict]):
+        for event in events:
+            for listener in self.listeners:
+                try:
+                    await listener(event)
+                except Exception as e:
+                    logger.error(f"Bar listener failed for {event['symbol']} M{event['timeframe']}: {e}")
+
+    # ----- lifecycle -----
+
+    def set_symbols(self, symbols: Iterable[str]):
+        """Aggregate ticks of ``symbols`` only"""
+        self.symbols = set(symbols)
+        if self._ticks is not None:
+            self._ticks.dispatcher.set_symbols(self._ticks, self.symbols)
+
+    def start(self, connector):
+        """Consume the connector's ticks for ``symbols`` and close bars as their period ends"""
+        self._ticks = connector.dispatcher.subscribe([])
+        self.set_symbols(self.symbols)
+        self._tasks = [asyncio.create_task(self._consume()), asyncio.create_task(self._expiry_loop())]
+        logger.info(f"Tick aggregator started for timeframes {self.timeframes}")
+
+    async def _consume(self):
+        async for tick in self._ticks:
+            try:
+                await self.on_tick(tick)
+            except Exception as e:
+                logger.error(f"Tick aggregation failed on tick {tick}: {e}")
+
+    async def _expiry_loop(self):
+        # Bars of symbols that stop ticking would otherwise only close on their next tick
+        step = self.timeframes[0] * 60
+        while True:
+            await asyncio.sleep(step - time.time() % step + self.delay)
+            try:
+                await self.close_expired(time.time())
+            except Exception as e:
+                logger.error(f"Closing expired bars failed: {e}")
+
+    async def stop(self):
+        """Stop consuming ticks (bars still forming are dropped)"""
+        if self._ticks is not None:
+            self._ticks.close()
+            self._ticks = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @staticmethod
+    def _as_dict(symbol: str, timeframe: int, bar: list) -> Dict:
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "time": bar[0],
+            "open": bar[1],
+            "high": bar[2],
+            "low": bar[3],
+            "close": bar[4],
+            "volume": bar[5],
+        }
+
+
+@lru_cache()
+def get_tick_aggregator() -> TickAggregator:
+    return TickAggregator()
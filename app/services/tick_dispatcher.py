@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TickSubscription:
+    """One subscriber's bounded tick queue
+
+    When the subscriber falls behind and the queue is full, the oldest tick is
+    dropped so the newest prices always get through.
+    """
+
+    def __init__(self, dispatcher: "TickDispatcher", symbols: Optional[Set[str]], maxsize: int):
+        self.dispatcher = dispatcher
+        self.symbols = symbols
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def offer(self, tick: Optional[Dict]):
+        """Enqueue a tick without blocking (``None`` ends the subscription)"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((tick, time.monotonic()))
+
+    async def get(self) -> Optional[Dict]:
+        """Next tick, or ``None`` once the subscription is closed"""
+        if self.closed and self.queue.empty():
+            return None
+
+        tick, enqueued_at = await self.queue.get()
+        if tick is None:
+            self.closed = True
+            return None
+
+        self.delivered += 1
+        self.last_lag = time.monotonic() - enqueued_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        return tick
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict:
+        tick = await self.get()
+        if tick is None:
+            raise StopAsyncIteration
+        return tick
+
+    def close(self):
+        """Stop receiving ticks"""
+        self.dispatcher.unsubscribe(self)
+
+    def metrics(self) -> Dict:
+        return {
+            "symbols": sorted(self.symbols) if self.symbols is not None else "*",
+            "queued": self.queue.qsize(),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+
+class TickDispatcher:
+    """Fans ticks for every subscribed symbol out to any number of async subscribers
+
+    A single loop polls the connector for all subscribed symbols at once;
+    ``publish`` can also be fed directly by a push-based connection.
+    """
+
+    def __init__(self, connector, interval: float = 0.25):
+        self.connector = connector
+        self.interval = interval
+        self._by_symbol: Dict[str, List[TickSubscription]] = {}
+        self._all_symbols: List[TickSubscription] = []
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+
+    @property
+    def symbols(self) -> List[str]:
+        return [symbol for symbol, subscribers in self._by_symbol.items() if subscribers]
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None, maxsize: int = 1000) -> TickSubscription:
+        """Subscribe to ticks of ``symbols`` (``None`` = every symbol that anyone subscribed to)"""
+        symbol_set = set(symbols) if symbols is not None else None
+        subscription = TickSubscription(self, symbol_set, maxsize)
+        if symbol_set is None:
+            self._all_symbols.append(subscription)
+        else:
+            for symbol in symbol_set:
+                self._by_symbol.setdefault(symbol, []).append(subscription)
+        return subscription
+
+    def set_symbols(self, subscription: TickSubscription, symbols: Iterable[str]):
+        """Change the symbols of an existing per-symbol subscription"""
+        symbol_set = set(symbols)
+        for symbol in (subscription.symbols or set()) - symbol_set:
+            self._by_symbol[symbol].remove(subscription)
+        for symbol in symbol_set - (subscription.symbols or set()):
+            self._by_symbol.setdefault(symbol, []).append(subscription)
+        subscription.symbols = symbol_set
+
+    def unsubscribe(self, subscription: TickSubscription):
+        if subscription.symbols is None:
+            if subscription in self._all_symbols:
+                self._all_symbols.remove(subscription)
+        else:
+            for symbol in subscription.symbols:
+                subscribers = self._by_symbol.get(symbol, [])
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+        subscription.offer(None)
+
+    def publish(self, tick: Dict):
+        """Deliver one tick to every matching subscriber"""
+        self.published += 1
+        for subscription in self._by_symbol.get(tick["symbol"], ()):
+            subscription.offer(tick)
+        for subscription in self._all_symbols:
+            subscription.offer(tick)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop polling and end every subscription"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for subscription in self._all_symbols + [s for subs in self._by_symbol.values() for s in subs]:
+            subscription.offer(None)
+        self._all_symbols = []
+        self._by_symbol = {}
+
+    async def _run(self):
+        while True:
+            symbols = self.symbols
+            if symbols:
+                try:
+                    for tick in await self.connector.get_ticks(symbols):
+                        self.publish(tick)
+                except Exception as e:
+                    logger.error(f"Tick polling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def metrics(self) -> Dict:
+        subscriptions = self._all_symbols + list({
+            id(s): s for subs in self._by_symbol.values() for s in subs
+        }.values())
+        return {
+            "symbols": self.symbols,
+            "published": self.published,
+            "subscribers": [subscription.metrics() for subscription in subscriptions],
+        }
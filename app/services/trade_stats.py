@@ -0,0 +1,127 @@
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.database import Trade, TradeStatus, TradeStatsDaily
+
+logger = logging.getLogger(__name__)
+
+# (user_id, closed_at, pnl) of one closed trade
+ClosedTrade = Tuple[int, datetime, float]
+
+
+def _buckets(closed: Iterable[ClosedTrade]) -> Dict[Tuple[int, date], Dict]:
+    buckets: Dict[Tuple[int, date], Dict] = {}
+    for user_id, closed_at, pnl in closed:
+        key = (user_id, closed_at.date())
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {
+                "user_id": user_id,
+                "day": key[1],
+                "trades": 0,
+                "winning_trades": 0,
+                "losing_trades": 0,
+                "total_pnl": 0.0,
+                "max_pnl": pnl,
+                "min_pnl": pnl,
+            }
+        bucket["trades"] += 1
+        bucket["winning_trades" if pnl > 0 else "losing_trades"] += 1
+        bucket["total_pnl"] += pnl
+        bucket["max_pnl"] = max(bucket["max_pnl"], pnl)
+        bucket["min_pnl"] = min(bucket["min_pnl"], pnl)
+    return buckets
+
+
+async def record_closed_trades(db: AsyncSession, closed: Iterable[ClosedTrade]):
+    """Fold closed trades into their users' day buckets (commit is left to the caller)
+
+    Runs as one atomic upsert, so it belongs in the same transaction as the
+    UPDATE that closes the trades.
+    """
+    rows = list(_buckets(closed).values())
+    if not rows:
+        return
+
+    table = TradeStatsDaily.__table__
+    statement = dialect_insert(db, table).values(rows)
+    new = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            "trades": table.c.trades + new.trades,
+            "winning_trades": table.c.winning_trades + new.winning_trades,
+            "losing_trades": table.c.losing_trades + new.losing_trades,
+            "total_pnl": table.c.total_pnl + new.total_pnl,
+            "max_pnl": case((new.max_pnl > table.c.max_pnl, new.max_pnl), else_=table.c.max_pnl),
+            "min_pnl": case((new.min_pnl < table.c.min_pnl, new.min_pnl), else_=table.c.min_pnl),
+        },
+    )
+    await db.execute(statement)
+
+
+async def get_trade_stats(db: AsyncSession, user_id: int, since: date) -> Dict:
+    """Closed-trade statistics of a user from ``since`` on, summed over the day buckets"""
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(TradeStatsDaily.trades), 0),
+            func.coalesce(func.sum(TradeStatsDaily.winning_trades), 0),
+            func.coalesce(func.sum(TradeStatsDaily.losing_trades), 0),
+            func.coalesce(func.sum(TradeStatsDaily.total_pnl), 0.0),
+            func.max(TradeStatsDaily.max_pnl),
+            func.min(TradeStatsDaily.min_pnl),
+        ).where(
+            TradeStatsDaily.user_id == user_id,
+            TradeStatsDaily.day >= since,
+        )
+    )
+    total, wins, losses, total_pnl, max_pnl, min_pnl = result.one()
+
+    return {
+        "total_trades": total,
+        "winning_trades": wins,
+        "losing_trades": losses,
+        "win_rate": round(wins / total * 100, 2) if total else 0.0,
+        "average_profit": round(total_pnl / total, 2) if total else 0.0,
+        "max_profit": round(max_pnl, 2) if max_pnl is not None else 0.0,
+        "max_loss": round(min_pnl, 2) if min_pnl is not None else 0.0,
+    }
+
+
+async def backfill_trade_stats(db: AsyncSession) -> int:
+    """Build the day buckets from the trades table if none exist yet; returns the rows written"""
+    existing = await db.execute(select(TradeStatsDaily.user_id).limit(1))
+    if existing.first() is not None:
+        return 0
+
+    day = func.date(Trade.closed_at)
+    source = (
+        select(
+            Trade.user_id,
+            day,
+            func.count(),
+            func.sum(case((Trade.pnl > 0, 1), else_=0)),
+            func.sum(case((Trade.pnl > 0, 0), else_=1)),
+            func.sum(Trade.pnl),
+            func.max(Trade.pnl),
+            func.min(Trade.pnl),
+        )
+        .where(Trade.status == TradeStatus.CLOSED, Trade.closed_at.isnot(None))
+        .group_by(Trade.user_id, day)
+    )
+    table = TradeStatsDaily.__table__
+    result = await db.execute(
+        table.insert().from_select(
+            ["user_id", "day", "trades", "winning_trades", "losing_trades", "total_pnl", "max_pnl", "min_pnl"],
+            source,
+        )
+    )
+    await db.commit()
+    if result.rowcount:
+        logger.info(f"Backfilled {result.rowcount} daily trade statistic rows")
+    return result.rowcount
@@ -0,0 +1,95 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+STOP_LOSS = "stop_loss"
+TAKE_PROFIT = "take_profit"
+
+
+class _SymbolLevels:
+    """Sorted (price, trade_id) levels for one symbol"""
+
+    def __init__(self):
+        self.long_stops: List[Tuple[float, int]] = []     # hit when bid <= level
+        self.long_targets: List[Tuple[float, int]] = []   # hit when bid >= level
+        self.short_stops: List[Tuple[float, int]] = []    # hit when ask >= level
+        self.short_targets: List[Tuple[float, int]] = []  # hit when ask <= level
+
+    def __len__(self) -> int:
+        return len(self.long_stops) + len(self.short_stops)
+
+
+def _remove(levels: List[Tuple[float, int]], entry: Tuple[float, int]):
+    i = bisect_left(levels, entry)
+    if i < len(levels) and levels[i] == entry:
+        del levels[i]
+
+
+class TriggerIndex:
+    """Stop-loss / take-profit levels of open trades, sorted per symbol and side
+
+    A tick finds every crossed level with one binary search per list, so
+    checking it costs O(log n + k) for k triggered trades.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, _SymbolLevels] = {}
+        # trade id -> (symbol, is_buy, stop_loss, take_profit)
+        self._trades: Dict[int, Tuple[str, bool, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __contains__(self, trade_id: int) -> bool:
+        return trade_id in self._trades
+
+    def add(self, trade_id: int, symbol: str, is_buy: bool, stop_loss: float, take_profit: float):
+        """Index a trade's levels (replacing any previous ones)"""
+        self.remove(trade_id)
+        levels = self._symbols.setdefault(symbol, _SymbolLevels())
+        if is_buy:
+            insort(levels.long_stops, (stop_loss, trade_id))
+            insort(levels.long_targets, (take_profit, trade_id))
+        else:
+            insort(levels.short_stops, (stop_loss, trade_id))
+            insort(levels.short_targets, (take_profit, trade_id))
+        self._trades[trade_id] = (symbol, is_buy, stop_loss, take_profit)
+
+    def remove(self, trade_id: int) -> bool:
+        entry = self._trades.pop(trade_id, None)
+        if entry is None:
+            return False
+
+        symbol, is_buy, stop_loss, take_profit = entry
+        levels = self._symbols[symbol]
+        if is_buy:
+            _remove(levels.long_stops, (stop_loss, trade_id))
+            _remove(levels.long_targets, (take_profit, trade_id))
+        else:
+            _remove(levels.short_stops, (stop_loss, trade_id))
+            _remove(levels.short_targets, (take_profit, trade_id))
+        if not levels:
+            del self._symbols[symbol]
+        return True
+
+    def crossed(self, symbol: str, bid: float, ask: float) -> List[Tuple[int, str, float]]:
+        """Trades whose stop or target is crossed by this tick, as (trade_id, reason, exit_price)
+
+        Longs exit at the bid and shorts at the ask. A trade is listed once; if
+        a tick crosses both of its levels the stop loss wins.
+        """
+        levels = self._symbols.get(symbol)
+        if levels is None:
+            return []
+
+        inf = float("inf")
+        hits = []
+        hits += [(i, STOP_LOSS, bid) for _, i in levels.long_stops[bisect_left(levels.long_stops, (bid, -inf)):]]
+        hits += [(i, TAKE_PROFIT, bid) for _, i in levels.long_targets[:bisect_right(levels.long_targets, (bid, inf))]]
+        hits += [(i, STOP_LOSS, ask) for _, i in levels.short_stops[:bisect_right(levels.short_stops, (ask, inf))]]
+        hits += [(i, TAKE_PROFIT, ask) for _, i in levels.short_targets[bisect_left(levels.short_targets, (ask, -inf)):]]
+        seen = set()
+        return [hit for hit in hits if not (hit[0] in seen or seen.add(hit[0]))]
+
+    def levels(self, trade_id: int) -> Optional[Tuple[float, float]]:
+        entry = self._trades.get(trade_id)
+        return (entry[2], entry[3]) if entry else None